@@ -0,0 +1,331 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from docx import Document
+from docx.shared import Cm
+
+from numbering import Number
+from render import add_paginated_table, add_paragraphs, format_table_paragraph, plan_table_parts
+from spec import SheetTable
+from styles import add_styles
+from tables import add_fast_table, merge_cells, proportional_widths, row_values, text_widths
+from workbook import WorkbookCache, sheet_paths
+
+# Замер производительности сборки документов: время каждого этапа (загрузка книги, подготовка таблиц листов,
+# ширины колонок, вывод таблиц, объединение ячеек, разбиение на части, doc.save) на исходных книгах
+# и их синтетических копиях с увеличенным в 10 раз (--scales: в 100, 1000 раз) числом строк, и время скриптов
+# bd.py, test.py, flows.py, dev_ol.py целиком. Заодно проверяется разбиение таблиц 'auto' (check_auto_pagination).
+# Результаты записываются в JSON
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SOURCES = ('database.xlsx', 'term.xlsx')
+SCALES = (1, 10)  # По умолчанию - быстрый прогон; ×100 и ×1000 занимают минуты и задаются явно через --scales
+# Скрипт -> исходная книга и путь, по которому скрипт её читает
+SCRIPTS = {
+    'bd.py': ('database.xlsx', 'database.xlsx'),
+    'test.py': ('database.xlsx', 'database.xlsx'),
+    'flows.py': ('term.xlsx', 'term.xlsx'),
+    'dev_ol.py': ('database/device/1.xlsx', 'database/device/1.xlsx'),
+}
+STAGES = ('load_workbook', 'prepare_tables', 'column_widths', 'emit_tables', 'merge_cells', 'save', 'paginate')
+ROWS_PER_PAGE = 50  # Строк в части таблицы при замере разбиения на части
+
+_SHEET_DATA = re.compile(rb'<sheetData>(.*)</sheetData>', re.S)
+_ROW = re.compile(rb'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+_ROW_NUMBER = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_CELL_REF = re.compile(rb'(<(?:row|c)\b[^>]*?\br="[A-Z]*)(\d+)"')
+_FORMULA = re.compile(rb'<f\b[^>]*?(?:/>|>.*?</f>)', re.S)
+_DIMENSION = re.compile(rb'<dimension ref="([A-Z]+\d+:)?([A-Z]+)(\d+)"/>')
+_MERGE_CELLS = re.compile(rb'<mergeCells\b[^>]*>(.*?)</mergeCells>', re.S)
+_MERGE_REF = re.compile(rb'<mergeCell ref="([A-Z]+)(\d+):([A-Z]+)(\d+)"/>')
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Синтетические книги
+
+def _shift_rows(xml, offset):
+    return _CELL_REF.sub(lambda match: match.group(1) + str(int(match.group(2)) + offset).encode() + b'"', xml)
+
+
+# XML листа с данными, повторёнными scale раз: строка 1 (заголовки колонок) остаётся одна, строки 2..N
+# повторяются с перенумерацией, объединённые диапазоны строк данных повторяются вместе с ними.
+# Формулы удаляются (остаются вычисленные значения), иначе они ссылались бы на исходные строки
+def _scale_sheet(xml, scale):
+    sheet_data = _SHEET_DATA.search(xml)
+    if sheet_data is None:
+        return xml
+    rows = _ROW.findall(sheet_data.group(1))
+    header = [row for row in rows if _ROW_NUMBER.match(row) and int(_ROW_NUMBER.match(row).group(1)) == 1]
+    data = [_FORMULA.sub(b'', row) for row in rows if row not in header]
+    max_row = max((int(_ROW_NUMBER.match(row).group(1)) for row in rows if _ROW_NUMBER.match(row)), default=1)
+    height = max_row - 1
+
+    parts = header + [_shift_rows(row, copy * height) for copy in range(scale) for row in data]
+    xml = xml[:sheet_data.start(1)] + b''.join(parts) + xml[sheet_data.end(1):]
+
+    merge_cells_match = _MERGE_CELLS.search(xml)
+    if merge_cells_match is not None:
+        merges = []
+        for min_col, min_row, max_col, merge_max_row in _MERGE_REF.findall(merge_cells_match.group(1)):
+            copies = 1 if int(min_row) == 1 else scale
+            for copy in range(copies):
+                offset = copy * height
+                merges.append(b'<mergeCell ref="%s%d:%s%d"/>' % (min_col, int(min_row) + offset,
+                                                                 max_col, int(merge_max_row) + offset))
+        xml = (xml[:merge_cells_match.start()] + b'<mergeCells count="%d">' % len(merges) + b''.join(merges)
+               + b'</mergeCells>' + xml[merge_cells_match.end():])
+
+    return _DIMENSION.sub(lambda match: b'<dimension ref="%s%s%d"/>' % (match.group(1) or b'', match.group(2),
+                                                                        1 + height * scale), xml, count=1)
+
+
+# Копия книги filename с увеличенным в scale раз числом строк данных на каждом листе
+def scale_workbook(filename, scale, output_file):
+    with zipfile.ZipFile(filename) as source:
+        paths = set(sheet_paths(source).values())
+        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as target:
+            for item in source.infolist():
+                data = source.read(item.filename)
+                if item.filename in paths:
+                    data = _scale_sheet(data, scale)
+                target.writestr(item, data, zipfile.ZIP_DEFLATED)
+    return output_file
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Этапы сборки
+
+def _new_document():
+    doc = Document()
+    add_styles(doc)
+    return doc
+
+
+# Один проход по этапам сборки для книги filename: этап -> секунды, и размеры данных
+def run_stages(filename, engine, output_dir):
+    seconds = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds[stage] = time.perf_counter() - start
+        return result
+
+    cache = WorkbookCache(engine)
+    total_width = Cm(25.5)
+    timed('load_workbook', cache.sheet_names, filename)
+    sheets = timed('prepare_tables', cache.read_all_with_merged_cells, filename)
+    widths = timed('column_widths', lambda: {sheet_name: proportional_widths(text_widths(sheet), total_width)
+                                             for sheet_name, (sheet, _) in sheets.items()})
+
+    # Каждый лист - одна таблица со строкой заголовков, как в render.add_table
+    doc = _new_document()
+    tables = timed('emit_tables', lambda: {
+        sheet_name: add_fast_table(doc, row_values(sheet), len(sheet.columns), format_table_paragraph,
+                                   widths[sheet_name], [str(column_name) for column_name in sheet.columns])
+        for sheet_name, (sheet, _) in sheets.items()})
+    timed('merge_cells', lambda: [merge_cells(tables[sheet_name], merged_ranges.spans(-1, len(sheet), row_offset=2))
+                                  for sheet_name, (sheet, merged_ranges) in sheets.items()])
+    output_file = os.path.join(output_dir, 'bench.docx')
+    timed('save', doc.save, output_file)
+    docx_bytes = os.path.getsize(output_file)
+
+    # Разбиение на части: заголовок «Таблица ...», части по ROWS_PER_PAGE строк с разрывами страниц
+    doc = _new_document()
+    timed('paginate', lambda: [add_paginated_table(doc, sheet, merged_ranges, Number((1, 1)),
+                                                   SheetTable('bench', sheet_name, sheet_name,
+                                                              ROWS_PER_PAGE, ROWS_PER_PAGE),
+                                                   total_width)
+                               for sheet_name, (sheet, merged_ranges) in sheets.items()])
+    cache.clear()
+
+    size = {'sheets': len(sheets),
+            'rows': sum(len(sheet) for sheet, _ in sheets.values()),
+            'cells': sum(len(sheet) * len(sheet.columns) for sheet, _ in sheets.values()),
+            'merged_ranges': sum(len(merged_ranges) for _, merged_ranges in sheets.values()),
+            'docx_bytes': docx_bytes}
+    return seconds, size
+
+
+def _summary(runs):
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+
+def bench_stages(filename, engine, repeat, output_dir):
+    runs = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        seconds, size = run_stages(filename, engine, output_dir)
+        for stage in STAGES:
+            runs[stage].append(seconds[stage])
+    return {'stages': {stage: _summary(stage_runs) for stage, stage_runs in runs.items()}, **size}
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Проверка разбиения 'auto'
+
+# Каждый лист книги разбивается на части pagination='auto' после fill строк текста, занимающих от нуля до двух с лишним
+# страниц. Часть из одной строки допустима только последней (строки исходных книг ниже страницы, место
+# для второй строки на странице есть). Возвращает нарушения [(лист, строк текста перед таблицей, части), ...]
+def check_auto_pagination(filename, engine, fills=range(0, 70, 5)):
+    # Документы с текстом перед таблицей; plan_table_parts только оценивает части, документ не меняется
+    docs = {}
+    for fill in fills:
+        docs[fill] = _new_document()
+        add_paragraphs(docs[fill], ['Текст'] * fill)
+
+    cache = WorkbookCache(engine)
+    violations = []
+    for sheet_name, (sheet, merged_ranges) in cache.read_all_with_merged_cells(filename).items():
+        block = SheetTable('check', sheet_name, sheet_name, pagination='auto')
+        for fill, doc in docs.items():
+            parts, _ = plan_table_parts(doc, sheet, merged_ranges, Number((1, 1)), block)
+            if any(end_row - start_row == 1 for start_row, end_row in parts[:-1]):
+                violations.append((sheet_name, fill, parts))
+    cache.clear()
+    return violations
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Скрипты целиком
+
+# Время скрипта script (отдельный процесс, включая импорт модулей) в каталоге work_dir,
+# где исходная книга лежит по пути, по которому её читает скрипт
+def bench_script(script, workbook_file, work_dir, repeat):
+    source, target = SCRIPTS[script]
+    os.makedirs(os.path.dirname(os.path.join(work_dir, target)), exist_ok=True)
+    shutil.copyfile(workbook_file, os.path.join(work_dir, target))
+    runs = []
+    for _ in range(repeat):
+        # Кэш сборки bd.py не переиспользуется между запусками: замеряется полная сборка
+        shutil.rmtree(os.path.join(work_dir, '.build_cache'), ignore_errors=True)
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, os.path.join(HERE, script)], cwd=work_dir,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        seconds = time.perf_counter() - start
+        if process.returncode != 0:
+            return {'status': 'error', 'error': process.stderr.strip().splitlines()[-1:]}
+        runs.append(seconds)
+    return {'status': 'ok', 'seconds': _summary(runs)}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(sources=SOURCES, scales=SCALES, scripts=tuple(SCRIPTS), engine='openpyxl', repeat=3,
+                   script_scales=(1,)):
+    results = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+               'commit': _git_commit(),
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'engine': engine,
+               'repeat': repeat,
+               'stages': [],
+               'scripts': [],
+               'auto_pagination': []}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Исходная книга (или её копия с масштабом scale) для каждого масштаба
+        def workbook_for(source, scale):
+            filename = os.path.join(HERE, source)
+            if scale == 1 or not os.path.exists(filename):
+                return filename
+            scaled = os.path.join(tmp_dir, f'x{scale}_{os.path.basename(source)}')
+            if not os.path.exists(scaled):
+                scale_workbook(filename, scale, scaled)
+            return scaled
+
+        for source in sources:
+            for scale in scales:
+                filename = workbook_for(source, scale)
+                if not os.path.exists(filename):
+                    results['stages'].append({'source': source, 'scale': scale, 'status': 'missing'})
+                    continue
+                print(f'{source} x{scale} ...', file=sys.stderr)
+                results['stages'].append({'source': source, 'scale': scale, 'status': 'ok',
+                                          **bench_stages(filename, engine, repeat, tmp_dir)})
+
+        for source in sources:
+            filename = os.path.join(HERE, source)
+            if os.path.exists(filename):
+                print(f'{source} pagination=auto ...', file=sys.stderr)
+                results['auto_pagination'] += [{'source': source, 'sheet': sheet_name, 'fill': fill, 'parts': parts}
+                                               for sheet_name, fill, parts in check_auto_pagination(filename, engine)]
+
+        for script in scripts:
+            for scale in script_scales:
+                source = SCRIPTS[script][0]
+                filename = workbook_for(source, scale)
+                if not os.path.exists(filename):
+                    results['scripts'].append({'script': script, 'source': source, 'scale': scale,
+                                               'status': 'missing'})
+                    continue
+                print(f'{script} x{scale} ...', file=sys.stderr)
+                work_dir = tempfile.mkdtemp(dir=tmp_dir)
+                results['scripts'].append({'script': script, 'source': source, 'scale': scale,
+                                           **bench_script(script, filename, work_dir, repeat)})
+    return results
+
+
+def print_results(results):
+    print(f"{'книга':>14} {'масштаб':>8} {'строк':>8} " + ' '.join(f'{stage:>18}' for stage in STAGES))
+    for result in results['stages']:
+        if result['status'] != 'ok':
+            print(f"{result['source']:>14} {result['scale']:>8} (нет книги)")
+            continue
+        print(f"{result['source']:>14} {result['scale']:>8} {result['rows']:>8} "
+              + ' '.join(f"{result['stages'][stage]['min']:18.4f}" for stage in STAGES))
+    for result in results['scripts']:
+        seconds = f"{result['seconds']['min']:8.2f} с" if result['status'] == 'ok' else result['status']
+        print(f"{result['script']:>14} {result['scale']:>8} {seconds}")
+    for result in results['auto_pagination']:
+        print(f"ОШИБКА: {result['source']}, лист {result['sheet']}, {result['fill']} строк текста перед таблицей: "
+              f"часть из одной строки в разбиении 'auto' {result['parts']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замер времени этапов сборки документов')
+    parser.add_argument('--sources', nargs='+', default=list(SOURCES), help='исходные книги')
+    parser.add_argument('--scales', nargs='+', type=int, default=list(SCALES),
+                        help='во сколько раз увеличить число строк листов (1 - исходная книга), например 1 10 100 1000')
+    parser.add_argument('--scripts', nargs='*', default=list(SCRIPTS), choices=list(SCRIPTS),
+                        help='скрипты, время которых замеряется целиком')
+    parser.add_argument('--script-scales', nargs='+', type=int, default=[1], help='масштабы книг для скриптов')
+    parser.add_argument('--engine', choices=('openpyxl', 'xml'), default='openpyxl', help='чтение листов')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='число повторов каждого замера')
+    parser.add_argument('-o', '--output', default=None,
+                        help='файл JSON с результатами (по умолчанию bench_results/<дата и время>.json)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sources, args.scales, args.scripts, args.engine, args.repeat, args.script_scales)
+    print_results(results)
+
+    output = args.output or os.path.join(HERE, 'bench_results',
+                                         results['timestamp'].replace(':', '-') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f'Результаты: {output}')
+
+    scripts_ok = all(result['status'] != 'error' for result in results['scripts'])
+    return 0 if scripts_ok and not results['auto_pagination'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
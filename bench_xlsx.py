@@ -0,0 +1,117 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+
+from column_table import ColumnTable
+from workbook import WorkbookCache
+
+
+# Сравнение чтения листов через openpyxl и напрямую из XML (engine='xml'): время чтения каждого листа
+# и совпадение результатов (таблицы листов и объединённые диапазоны)
+
+def _read_sheets(engine, filename):
+    cache = WorkbookCache(engine)
+    start = time.perf_counter()
+    sheet_names = cache.sheet_names(filename)
+    open_seconds = time.perf_counter() - start
+
+    sheets = {}
+    for sheet_name in sheet_names:
+        start = time.perf_counter()
+        sheet, merged_ranges = cache.read_excel_with_merged_cells(filename, sheet_name)
+        sheets[sheet_name] = sheet, merged_ranges, time.perf_counter() - start
+    cache.clear()
+    return open_seconds, sheets
+
+
+# Таблицы сравниваются через pandas (to_dataframe): так же сравниваются типы колонок и пропуски NaN
+def _same_sheet(expected, actual):
+    import pandas as pd
+    (expected_sheet, expected_ranges, _), (actual_sheet, actual_ranges, _) = expected, actual
+    try:
+        pd.testing.assert_frame_equal(expected_sheet.to_dataframe(), actual_sheet.to_dataframe())
+    except AssertionError:
+        return False
+    return sorted(map(str, expected_ranges)) == sorted(map(str, actual_ranges))
+
+
+def bench(filename):
+    openpyxl_open, openpyxl_sheets = _read_sheets('openpyxl', filename)
+    xml_open, xml_sheets = _read_sheets('xml', filename)
+
+    print(filename)
+    print(f"{'лист':>12} {'строк':>7} {'openpyxl, с':>12} {'xml, с':>8} {'ускорение':>10}  результат")
+    print(f"{'(открытие)':>12} {'':>7} {openpyxl_open:12.4f} {xml_open:8.4f} {openpyxl_open / xml_open:9.1f}x")
+    all_same = True
+    for sheet_name, expected in openpyxl_sheets.items():
+        actual = xml_sheets[sheet_name]
+        same = _same_sheet(expected, actual)
+        all_same = all_same and same
+        print(f'{sheet_name:>12} {len(expected[0]):7} {expected[2]:12.4f} {actual[2]:8.4f} '
+              f"{expected[2] / actual[2]:9.1f}x  {'совпадает' if same else 'ОТЛИЧАЕТСЯ'}")
+
+    openpyxl_total = openpyxl_open + sum(sheet[2] for sheet in openpyxl_sheets.values())
+    xml_total = xml_open + sum(sheet[2] for sheet in xml_sheets.values())
+    print(f"{'всего':>12} {'':>7} {openpyxl_total:12.4f} {xml_total:8.4f} {openpyxl_total / xml_total:9.1f}x")
+    return all_same
+
+
+# Лист с неверным элементом dimension: <dimension ref="A1"/>, а ячейки идут дальше (так пишут некоторые программы).
+# Оба способа чтения должны вернуть все строки и колонки листа, а не одну ячейку A1
+_WRONG_DIMENSION_ROWS = [('Колонка 1', 'Колонка 2', 'Колонка 3'), (1, 'a', None), (2, None, 'c'), (3, 'b', 'd')]
+
+
+def _write_wrong_dimension_workbook(filename):
+    from openpyxl import Workbook
+    workbook = Workbook()
+    for row in _WRONG_DIMENSION_ROWS:
+        workbook.active.append(row)
+    workbook.save(filename)
+
+    # Элемент dimension заменяется в XML листа после сохранения: openpyxl всегда пишет верный
+    with zipfile.ZipFile(filename) as archive:
+        files = {name: archive.read(name) for name in archive.namelist()}
+    sheet_path = 'xl/worksheets/sheet1.xml'
+    files[sheet_path] = re.sub(rb'<dimension ref="[^"]*"\s*/>', b'<dimension ref="A1"/>', files[sheet_path])
+    with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+
+
+def check_wrong_dimension():
+    header, *rows = _WRONG_DIMENSION_ROWS
+    expected = ColumnTable.from_columns(header, [list(column) for column in zip(*rows)], len(rows))
+    all_same = True
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'dimension.xlsx')
+        _write_wrong_dimension_workbook(filename)
+        for engine in ('openpyxl', 'xml'):
+            cache = WorkbookCache(engine)
+            sheet_name, = cache.sheet_names(filename)
+            sheet, merged_ranges = cache.read_excel_with_merged_cells(filename, sheet_name)
+            cache.clear()
+            same = _same_sheet((expected, [], 0), (sheet, merged_ranges, 0))
+            all_same = all_same and same
+            print(f"неверный dimension, {engine}: {len(sheet)}x{len(sheet.columns)}, "
+                  f"{'совпадает' if same else 'ОТЛИЧАЕТСЯ'}")
+    return all_same
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сравнение чтения листов через openpyxl и напрямую из XML')
+    parser.add_argument('files', nargs='*', default=['database.xlsx', 'term.xlsx'], help='книги Excel')
+    args = parser.parse_args(argv)
+
+    all_same = True
+    for filename in args.files:
+        all_same = bench(filename) and all_same
+    all_same = check_wrong_dimension() and all_same
+    return 0 if all_same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
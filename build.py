@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import bd
+import workbook
+
+
+# Сборка одного Базового проекта в процессе пула. Процессы пула выполняют задания по очереди, а кэш книг
+# (workbook.cache) общий для процесса, поэтому после каждого задания он сбрасывается: книги проекта
+# закрываются, прочитанные листы не копятся от задания к заданию
+def build_project(database_file, output_file, cache_dir=None, engine='openpyxl', sheet_jobs=1, compresslevel=None):
+    start = time.perf_counter()
+    try:
+        workbook.cache.set_engine(engine)
+        bd.create_document(database_file, output_file, cache_dir, sheet_jobs, compresslevel)
+    except Exception as e:
+        return {'database_file': database_file, 'output_file': output_file, 'status': 'error',
+                'error': f'{type(e).__name__}: {e}', 'seconds': time.perf_counter() - start}
+    finally:
+        workbook.cache.clear()
+    return {'database_file': database_file, 'output_file': output_file, 'status': 'ok',
+            'seconds': time.perf_counter() - start}
+
+
+# Имена выходных документов для исходных книг: БП_<имя книги>.docx. Книги с одинаковым именем из разных
+# каталогов (например, папки заказчиков с database.xlsx) получают имя каталога: БП_<каталог>_<имя книги>.docx;
+# если имена совпадают и после этого (та же книга указана дважды), добавляется номер задания
+def output_files_for(database_files, output_dir):
+    names = [os.path.splitext(os.path.basename(database_file))[0] for database_file in database_files]
+    if len(set(names)) != len(names):
+        names = [f'{os.path.basename(os.path.dirname(os.path.abspath(database_file)))}_{name}'
+                 for database_file, name in zip(database_files, names)]
+    if len(set(names)) != len(names):
+        names = [f'{name}_{index}' for index, name in enumerate(names, 1)]
+    return [os.path.join(output_dir, f'БП_{name}.docx') for name in names]
+
+
+def build_projects(database_files, output_dir='.', jobs=None, cache_dir=None, engine='openpyxl', sheet_jobs=1,
+                   compresslevel=None):
+    os.makedirs(output_dir, exist_ok=True)
+    output_files = output_files_for(database_files, output_dir)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(build_project, database_file, output_file, cache_dir, engine, sheet_jobs,
+                                   compresslevel): index
+                   for index, (database_file, output_file) in enumerate(zip(database_files, output_files))}
+        # Порядок сводки совпадает с порядком входных файлов
+        results = [None] * len(futures)
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Параллельная сборка документов Базового проекта')
+    parser.add_argument('database_files', nargs='+', help='исходные книги проектов (формат database.xlsx)')
+    parser.add_argument('-o', '--output-dir', default='.', help='каталог для документов БП')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='число процессов (по умолчанию - число ядер)')
+    parser.add_argument('--summary', default=None,
+                        help='файл JSON со сводкой времени (по умолчанию build_summary.json в каталоге документов)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='каталог кэша сборки: неизменённые главы не строятся заново (по умолчанию без кэша)')
+    parser.add_argument('--engine', choices=('openpyxl', 'xml'), default='openpyxl',
+                        help='чтение листов: openpyxl или напрямую из XML листа (быстрее, значения те же)')
+    parser.add_argument('--sheet-jobs', type=int, default=1,
+                        help='число процессов для подготовки листов внутри одного проекта (по умолчанию 1 - без пула)')
+    parser.add_argument('--compress-level', type=int, choices=range(10), default=None, metavar='0-9',
+                        help='степень сжатия .docx: 0 - быстрее, файл больше, 9 - меньше (по умолчанию как в Word)')
+    args = parser.parse_intermixed_args(argv)
+
+    start = time.perf_counter()
+    results = build_projects(args.database_files, args.output_dir, args.jobs, args.cache_dir, args.engine,
+                             args.sheet_jobs, args.compress_level)
+    total_seconds = time.perf_counter() - start
+
+    for result in results:
+        line = f"{result['seconds']:8.2f} с  {result['status']:5}  {result['database_file']} -> {result['output_file']}"
+        if result['status'] != 'ok':
+            line += f"  ({result['error']})"
+        print(line)
+    print(f'{total_seconds:8.2f} с  всего, заданий: {len(results)}')
+
+    summary_file = args.summary or os.path.join(args.output_dir, 'build_summary.json')
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump({'total_seconds': total_seconds, 'jobs': results}, f, ensure_ascii=False, indent=2)
+
+    return 0 if all(result['status'] == 'ok' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
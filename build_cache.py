@@ -0,0 +1,159 @@
+import copy
+import hashlib
+import os
+import pickle
+import zipfile
+import xml.etree.ElementTree as ET
+
+from docx.oxml import OxmlElement
+from docx.oxml.parser import parse_xml
+from lxml import etree
+
+from workbook import sheet_paths
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+# Модули, от которых зависит оформление глав: при их изменении все фрагменты строятся заново
+_RENDER_MODULES = ('render.py', 'spec.py', 'styles.py', 'tables.py', 'templates.py', 'numbering.py', 'workbook.py',
+                   'column_table.py', 'xlsx.py', 'parameters.py', 'build_cache.py')
+
+
+# Хэш содержимого: строка из частей, разделённых нулевым символом
+def _digest(*parts):
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(str(part).encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def _code_digest():
+    here = os.path.dirname(os.path.abspath(__file__))
+    sha = hashlib.sha256()
+    for name in _RENDER_MODULES:
+        with open(os.path.join(here, name), 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+# Хэши содержимого листов книги Excel: значения ячеек (с форматом числа, от которого зависит
+# тип значения, например дата) и объединённые диапазоны. Книга разбирается напрямую из zip,
+# без загрузки в openpyxl, поэтому проверка «изменился ли лист» почти ничего не стоит
+class SheetDigests:
+    def __init__(self, filename):
+        self.filename = filename
+        self._digests = {}
+        with zipfile.ZipFile(filename) as archive:
+            self._shared_strings = self._read_shared_strings(archive)
+            self._number_formats = self._read_number_formats(archive)
+            self._paths = sheet_paths(archive)
+            for sheet_name, path in self._paths.items():
+                self._digests[sheet_name] = self._sheet_digest(archive.read(path))
+
+    @staticmethod
+    def _read_shared_strings(archive):
+        if 'xl/sharedStrings.xml' not in archive.namelist():
+            return []
+        root = ET.fromstring(archive.read('xl/sharedStrings.xml'))
+        return [''.join(t.text or '' for t in si.iter(f'{_MAIN_NS}t')) for si in root.iter(f'{_MAIN_NS}si')]
+
+    # Номер стиля ячейки -> формат числа. Хэшируется формат, а не номер стиля: номера стилей
+    # меняются при пересохранении книги, даже если содержимое листов осталось прежним
+    @staticmethod
+    def _read_number_formats(archive):
+        if 'xl/styles.xml' not in archive.namelist():
+            return []
+        root = ET.fromstring(archive.read('xl/styles.xml'))
+        codes = {fmt.get('numFmtId'): fmt.get('formatCode') for fmt in root.iter(f'{_MAIN_NS}numFmt')}
+        cell_xfs = root.find(f'{_MAIN_NS}cellXfs')
+        if cell_xfs is None:
+            return []
+        return [codes.get(xf.get('numFmtId', '0'), xf.get('numFmtId', '0')) for xf in cell_xfs.findall(f'{_MAIN_NS}xf')]
+
+    # Хэш не зависит от того, как книга записана: общие или встроенные строки, точность записи чисел,
+    # номера стилей и порядок объединённых диапазонов в XML на него не влияют
+    def _sheet_digest(self, xml):
+        cells = []
+        merges = []
+        for element in ET.fromstring(xml).iter():
+            if element.tag == f'{_MAIN_NS}c':
+                cell_type = element.get('t')
+                if cell_type == 's':
+                    value = self._shared_strings[int(element.findtext(f'{_MAIN_NS}v'))]
+                elif cell_type == 'inlineStr':
+                    value = ''.join(t.text or '' for t in element.iter(f'{_MAIN_NS}t'))
+                else:
+                    value = element.findtext(f'{_MAIN_NS}v')
+                if value is None or value == '':
+                    continue
+                # Общая, встроенная и вычисленная формулой строка дают одно и то же значение ячейки,
+                # тип 'n' (число) - тип по умолчанию
+                if cell_type in ('s', 'inlineStr', 'str'):
+                    cell_type = 'str'
+                elif cell_type is None or cell_type == 'n':
+                    cell_type = 'n'
+                    value = repr(float(value))
+                number_format = self._number_formats[int(element.get('s', '0'))] if self._number_formats else '0'
+                cells.append((element.get('r'), cell_type, number_format, value))
+            elif element.tag == f'{_MAIN_NS}mergeCell':
+                merges.append(element.get('ref'))
+        return _digest(*cells, *sorted(merges))
+
+    def __getitem__(self, sheet_name):
+        return self._digests[sheet_name]
+
+
+# Кэш сборки на диске: готовые XML-фрагменты глав и вычисленные значения (параметры документа).
+# Ключ записи - хэш всех входных данных, поэтому устаревшие записи просто перестают использоваться
+class BuildCache:
+    def __init__(self, cache_dir='.build_cache'):
+        self.cache_dir = cache_dir
+        self.code_digest = _code_digest()
+        self._sheet_digests = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Хэш содержимого листа (каждая книга разбирается один раз за сборку)
+    def sheet_digest(self, filename, sheet_name):
+        if filename not in self._sheet_digests:
+            self._sheet_digests[filename] = SheetDigests(filename)
+        return self._sheet_digests[filename][sheet_name]
+
+    def key(self, *parts):
+        return _digest(self.code_digest, *parts)
+
+    def _path(self, key, extension):
+        return os.path.join(self.cache_dir, key + extension)
+
+    def _write(self, path, data):
+        # Запись через временный файл: параллельные сборки не видят недописанных файлов
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # Фрагмент главы: (элементы тела документа, итоговый w:sectPr документа); None, если фрагмента нет
+    def load_fragment(self, key):
+        path = self._path(key, '.xml')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            body = parse_xml(f.read())
+        elements = list(body)
+        return elements[:-1], elements[-1]
+
+    def store_fragment(self, key, elements, sectPr):
+        body = OxmlElement('w:body')
+        for element in elements:
+            body.append(copy.deepcopy(element))
+        body.append(copy.deepcopy(sectPr))
+        self._write(self._path(key, '.xml'), etree.tostring(body, encoding='UTF-8'))
+
+    def load_value(self, key):
+        path = self._path(key, '.pickle')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def store_value(self, key, value):
+        self._write(self._path(key, '.pickle'), pickle.dumps(value))
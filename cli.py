@@ -0,0 +1,154 @@
+import argparse
+import sys
+import time
+
+# Единая точка запуска генераторов документов:
+#   python cli.py bp [--database database.xlsx] [-o БП.docx] [--no-cache] [--sheet-jobs N]
+#   python cli.py flows [--term term.xlsx] [-o потоки.docx] [--font-metrics]
+#   python cli.py ol [--device database/device/1.xlsx] [-o "ОЛ #1.docx"]
+#   python cli.py test [--database database.xlsx] [-o test.docx]
+# Общие параметры: --engine openpyxl|xml, --compress-level 0-9, --dry-run (проверить, что исходные книги
+# и листы на месте, и показать, что будет построено, без построения документа).
+# Модули генераторов импортируются только выбранной командой: --help не загружает ни python-docx, ни openpyxl,
+# а --dry-run - openpyxl (книга читается только как zip). pandas при сборке документов не загружается,
+# а с --engine xml не загружается и openpyxl
+
+
+# Имена листов книг для --dry-run: filename -> список листов или None
+_workbook_sheets = {}
+
+
+# Имена листов книги без загрузки в openpyxl; None - файла нет или это не книга xlsx
+def _sheet_names(filename):
+    if filename not in _workbook_sheets:
+        import zipfile
+        from workbook import sheet_paths
+        try:
+            with zipfile.ZipFile(filename) as archive:
+                _workbook_sheets[filename] = list(sheet_paths(archive))
+        except (OSError, zipfile.BadZipFile):
+            _workbook_sheets[filename] = None
+    return _workbook_sheets[filename]
+
+
+# Проверка листов [(filename, sheet_name), ...]: печатает отсутствующие, возвращает код выхода
+def _check_sheets(keys):
+    errors = []
+    for filename, sheet_name in keys:
+        sheet_names = _sheet_names(filename)
+        if sheet_names is None:
+            errors.append(f'ОШИБКА: Файл {filename} не найден.')
+        elif sheet_name not in sheet_names:
+            errors.append(f'ОШИБКА: Лист {sheet_name} не найден в файле {filename}.')
+    for error in dict.fromkeys(errors):
+        print(error)
+    return 1 if errors else 0
+
+
+# План документа по описанию: главы, номера таблиц и их листы
+def _dry_run_spec(spec, database_file):
+    from render import compile_spec
+    from spec import SheetTable
+
+    compiled = compile_spec(spec, database_file)
+    for chapter, number in zip(spec.chapters, compiled.chapter_numbers):
+        print(f'{number} {chapter.title}' if number is not None else '(без заголовка)')
+        for block in chapter.blocks:
+            if isinstance(block, SheetTable):
+                print(f'    Таблица {compiled.table_numbers[block.id]} – лист {block.sheet}: {block.title}')
+    keys = list(compiled.sheets)
+    if spec.parameters is not None:
+        keys.append((database_file, spec.parameters_sheet))
+    return _check_sheets(keys)
+
+
+def _bp(args):
+    import bd
+    if args.dry_run:
+        return _dry_run_spec(bd.BP_SPEC, args.database)
+    bd.create_document(args.database, args.output, None if args.no_cache else args.cache_dir, args.sheet_jobs,
+                       args.compress_level)
+    return 0
+
+
+def _test(args):
+    import test
+    if args.dry_run:
+        return _dry_run_spec(test.TEST_SPEC, args.database)
+    test.create_document(args.database, args.output, args.compress_level)
+    return 0
+
+
+def _flows(args):
+    if args.dry_run:
+        sheet_names = _sheet_names(args.term)
+        if sheet_names is None:
+            print(f'ОШИБКА: Файл {args.term} не найден.')
+            return 1
+        for number, sheet_name in enumerate(sheet_names, 1):
+            print(f'    Таблица 1.{number} – Поток № {sheet_name}')
+        return 0
+    import flows
+    flows.create_document(args.term, args.output, args.compress_level, args.font_metrics)
+    return 0
+
+
+def _ol(args):
+    if args.dry_run:
+        return _check_sheets([(args.device, '1')])
+    import dev_ol
+    dev_ol.create_document(args.output, args.compress_level, args.device)
+    return 0
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--engine', choices=('openpyxl', 'xml'), default='openpyxl',
+                        help='чтение листов: openpyxl или напрямую из XML листа (быстрее, значения те же)')
+    common.add_argument('--compress-level', type=int, choices=range(10), default=None, metavar='0-9',
+                        help='степень сжатия .docx: 0 - быстрее, файл больше, 9 - меньше')
+    common.add_argument('--dry-run', action='store_true',
+                        help='проверить исходные книги и листы и показать план документа, не строя его')
+
+    parser = argparse.ArgumentParser(description='Сборка документов: БП, потоки, опросный лист, тестовый документ')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bp = commands.add_parser('bp', parents=[common], help='Базовый проект (bd.py)')
+    bp.add_argument('--database', default='database.xlsx', help='исходная книга проекта')
+    bp.add_argument('-o', '--output', default='БП.docx')
+    bp.add_argument('--cache-dir', default='.build_cache', help='каталог кэша сборки (по умолчанию .build_cache)')
+    bp.add_argument('--no-cache', action='store_true', help='строить все главы заново, без кэша сборки')
+    bp.add_argument('--sheet-jobs', type=int, default=1, help='число процессов для подготовки листов')
+    bp.set_defaults(run=_bp)
+
+    flows = commands.add_parser('flows', parents=[common], help='Таблицы потоков (flows.py)')
+    flows.add_argument('--term', default='term.xlsx', help='книга потоков (лист на поток)')
+    flows.add_argument('-o', '--output', default='потоки.docx')
+    flows.add_argument('--font-metrics', action='store_true',
+                       help='ширины колонок по ширине текста Times New Roman, а не по числу символов')
+    flows.set_defaults(run=_flows)
+
+    ol = commands.add_parser('ol', parents=[common], help='Опросный лист (dev_ol.py)')
+    ol.add_argument('--device', default='database/device/1.xlsx', help='книга с данными аппарата')
+    ol.add_argument('-o', '--output', default='ОЛ #1.docx')
+    ol.set_defaults(run=_ol)
+
+    test = commands.add_parser('test', parents=[common], help='Тестовый документ (test.py)')
+    test.add_argument('--database', default='database.xlsx', help='исходная книга проекта')
+    test.add_argument('-o', '--output', default='test.docx')
+    test.set_defaults(run=_test)
+
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if not args.dry_run:
+        import workbook
+        workbook.cache.set_engine(args.engine)
+    status = args.run(args)
+    if not args.dry_run and status == 0:
+        print(f'{time.perf_counter() - start:8.2f} с  {args.output}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
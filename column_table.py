@@ -0,0 +1,70 @@
+import datetime
+
+# Таблица листа Excel без pandas: заголовки колонок и значения по колонкам (кортеж списков).
+# Листы исходных книг в основном маленькие (десятки ячеек), и построение DataFrame на каждый лист
+# стоило дороже самой таблицы Word. pandas нужен только для to_dataframe: через него bench_xlsx.py сравнивает таблицы
+
+_NAN = float('nan')
+
+
+# Пустые значения колонки заменяются так же, как при построении DataFrame по колонкам: в числовой колонке
+# целые становятся float, а None - NaN; в колонке строк или дат None становится NaN (у pandas - NaN и NaT).
+# Колонки смешанных типов и колонки без пропусков не меняются
+def _column_values(values):
+    types = {type(value) for value in values}
+    has_none = type(None) in types
+    types.discard(type(None))
+    if not types:
+        return values
+    if types <= {int, float} and (has_none or float in types):
+        return [_NAN if value is None else float(value) for value in values]
+    if has_none and (types == {str} or types == {datetime.datetime}):
+        return [_NAN if value is None else value for value in values]
+    return values
+
+
+# Пропуск в колонке: None или NaN
+def _is_missing(value):
+    return value is None or value != value
+
+
+# Текст значений колонки для оценки ширины, как при astype('string') в pandas: колонка одних дат
+# без времени выводится датами
+def column_text(values):
+    present = [value for value in values if not _is_missing(value)]
+    if present and all(type(value) is datetime.datetime and value.time() == datetime.time() for value in present):
+        return [str(value.date()) for value in present]
+    return [str(value) for value in present]
+
+
+# columns - заголовки колонок (первая строка листа), data - кортеж колонок, n_rows - число строк без заголовка.
+# len(table) и table.columns - как у DataFrame, поэтому таблицы Word строятся по ней без изменений
+class ColumnTable:
+    __slots__ = ('columns', 'data', 'n_rows', '__weakref__')
+
+    def __init__(self, columns=(), data=(), n_rows=0):
+        self.columns = list(columns)
+        self.data = tuple(data)
+        self.n_rows = n_rows
+
+    # Таблица из заголовков и колонок значений, прочитанных из листа (пропуски - None)
+    @classmethod
+    def from_columns(cls, header, columns, n_rows):
+        return cls(_column_values(header), [_column_values(column) for column in columns], n_rows)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __repr__(self):
+        return f'<ColumnTable {self.n_rows}x{len(self.columns)}>'
+
+    # Строки таблицы: список строк, каждая - список значений колонок
+    def rows(self):
+        return [list(row) for row in zip(*self.data)]
+
+    # DataFrame pandas с теми же заголовками и значениями (pandas импортируется только здесь)
+    def to_dataframe(self):
+        import pandas as pd
+        df = pd.DataFrame(dict(enumerate(self.data)), index=pd.RangeIndex(self.n_rows))
+        df.columns = self.columns
+        return df
@@ -0,0 +1,36 @@
+# Нумерация глав, таблиц и рисунков целыми числами: номер - кортеж (2,), (2, 10), (2, 1, 3),
+# выводится через точку. В отличие от сложения дробей 0.1 не накапливает погрешность,
+# и десятая таблица главы 2 - это 2.10, а не 3.0
+
+
+# Номер раздела или объекта: кортеж целых, str() и f'{number}' дают '2.10'.
+# Формат '.Nf' оставлен для шаблонов текста времён дробной нумерации: {table5_5:.1f} - первые N + 1 уровней
+class Number(tuple):
+    def __str__(self):
+        return '.'.join(str(part) for part in self)
+
+    def __format__(self, format_spec):
+        if format_spec.startswith('.') and format_spec.endswith('f') and format_spec[1:-1].isdigit():
+            return str(Number(self[:int(format_spec[1:-1]) + 1]))
+        return format(str(self), format_spec)
+
+
+# Счётчики нумерации документа: heading(level) - следующий заголовок уровня level (1 - глава),
+# next(kind) - следующий объект вида kind ('table', 'figure', ...) в текущей главе: номер главы и порядковый
+# номер объекта. Счётчики объектов начинаются заново в каждой главе
+class Numbering:
+    def __init__(self):
+        self._headings = []
+        self._counts = {}
+
+    def heading(self, level=1):
+        del self._headings[level:]
+        self._headings.extend([0] * (level - len(self._headings)))
+        self._headings[level - 1] += 1
+        if level == 1:
+            self._counts.clear()
+        return Number(self._headings)
+
+    def next(self, kind):
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        return Number((*self._headings[:1], self._counts[kind]))
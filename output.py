@@ -0,0 +1,61 @@
+import io
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from docx.opc.pkgwriter import PackageWriter
+
+import profiling
+
+
+# Запись частей пакета .docx в zip-архив с заданной степенью сжатия (тот же интерфейс, что у PhysPkgWriter
+# python-docx, поэтому содержимое архива собирается теми же функциями PackageWriter, что и в doc.save)
+class _ZipPackageWriter:
+    def __init__(self, sink, compresslevel):
+        self._zipf = ZipFile(sink, 'w', compression=ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def write(self, pack_uri, blob):
+        self._zipf.writestr(pack_uri.membername, blob)
+
+    def close(self):
+        self._zipf.close()
+
+
+# Приёмник архива, отдающий его кусками: write(chunk) вызывается для каждых chunk_size байт (последний кусок
+# может быть меньше). Перемотка не нужна, поэтому каждая часть документа уходит сразу после сжатия,
+# не дожидаясь сборки всего архива (например, в ответ HTTP с Transfer-Encoding: chunked)
+class ChunkWriter:
+    def __init__(self, write, chunk_size=64 * 1024):
+        self._write = write
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self._buffer:
+            self._write(bytes(self._buffer))
+            self._buffer.clear()
+
+
+# Сохранение документа в sink: путь к файлу или файловый объект, в том числе без перемотки (ChunkWriter).
+# compresslevel - степень сжатия zip от 0 (быстрее, файл больше) до 9; None - по умолчанию zlib, как в doc.save
+def save_document(doc, sink, compresslevel=None):
+    with profiling.span('doc.save'):
+        package = doc.part.package
+        for part in package.parts:
+            part.before_marshal()
+        writer = _ZipPackageWriter(sink, compresslevel)
+        PackageWriter._write_content_types_stream(writer, package.parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, package.parts)
+        writer.close()
+
+
+# Документ .docx в памяти, без записи на диск
+def document_bytes(doc, compresslevel=None):
+    buffer = io.BytesIO()
+    save_document(doc, buffer, compresslevel)
+    return buffer.getvalue()
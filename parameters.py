@@ -0,0 +1,200 @@
+import re
+from dataclasses import dataclass
+
+import workbook
+
+
+# Параметры документа с листа '1' исходной книги. Лист просматривается один раз: строки индексируются
+# по подписи в колонке A, а таблицы условий («Рабочие условия» | «Давление...» | «Температура...») -
+# по номеру таблицы, условию (calc/work/...) и роли колонки (p/t). Параметры задаются в PARAMETERS
+# по подписям, а не по номерам строк, поэтому вставка строк на листе их не сдвигает
+
+class ParameterError(LookupError):
+    pass
+
+
+# Значение из строки с подписью label: колонка Excel column, row - номер строки среди строк подписи
+# (строки без подписи сразу под подписанной относятся к ней же), table - номер таблицы на листе
+@dataclass(frozen=True)
+class Cell:
+    label: str
+    column: str
+    row: int = 0
+    table: int = None
+    type: type = None
+
+
+# Значение из таблицы условий: номер таблицы, условие (calc, work, normal, min, max),
+# роль колонки (p - давление, t - температура), index - номер колонки роли (у объединённой подписи их несколько)
+@dataclass(frozen=True)
+class Condition:
+    table: int
+    condition: str
+    role: str
+    index: int = 0
+    type: type = None
+
+
+# Имя параметра -> его место на листе '1'
+PARAMETERS = {
+    'work_time': Cell('Режим 1: непрерывно', 'D', type=float),
+    'mass_frac_tiols': Cell('Массовая доля меркаптановой серы, %', 'E', table=1),
+    'mass_frac_sulphur': Cell('Массовая доля серы, %', 'E', table=1),
+    'min_flow_rate': Cell('Доступное количество керосиновой фракции', 'D', type=float),
+    'flow_rate': Cell('Доступное количество керосиновой фракции', 'D', row=1, type=float),
+    'MPS_calc_p': Condition(5, 'calc', 'p'),
+    'MPS_calc_t': Condition(5, 'calc', 't'),
+    'MPS_work_p': Condition(5, 'work', 'p'),
+    'MPS_work_t': Condition(5, 'work', 't'),
+    'LPS_calc_p': Condition(6, 'calc', 'p'),
+    'LPS_calc_t': Condition(6, 'calc', 't'),
+    'LPS_work_p': Condition(6, 'work', 'p'),
+    'LPS_work_t': Condition(6, 'work', 't'),
+    'water_direct_p': Condition(7, 'normal', 'p'),
+    'water_direct_t': Condition(7, 'normal', 't'),
+    'water_reversed_p': Condition(8, 'normal', 'p'),
+    'water_reversed_t': Condition(8, 'normal', 't'),
+    'LPG_Nitrogen_calc_p': Condition(11, 'calc', 'p'),
+    'LPG_Nitrogen_calc_t': Condition(11, 'calc', 't'),
+    'LPG_Nitrogen_work_p': Condition(11, 'work', 'p'),
+    'LPG_Nitrogen_work_t': Condition(11, 'work', 't'),
+    'HPG_Nitrogen_calc_p': Condition(12, 'calc', 'p'),
+    'HPG_Nitrogen_calc_t': Condition(12, 'calc', 't'),
+    'HPG_Nitrogen_work_p': Condition(12, 'work', 'p'),
+    'HPG_Nitrogen_work_t': Condition(12, 'work', 't'),
+    'air_calc_p': Condition(13, 'calc', 'p'),
+    'air_calc_t_min': Condition(13, 'calc', 't'),
+    'air_calc_t_max': Condition(13, 'calc', 't', index=1, type=float),
+    'air_work_p': Condition(13, 'work', 'p'),
+    'air_work_t': Condition(13, 'work', 't'),
+}
+
+_TABLE_TITLE = re.compile(r'таблица\s+(\d+)')
+_CONDITIONS_HEADER = 'рабочие условия'
+# Начало подписи строки таблицы условий -> условие
+_CONDITIONS = {'расчет': 'calc', 'рабоч': 'work', 'нормал': 'normal', 'миним': 'min', 'максим': 'max'}
+# Начало подписи колонки таблицы условий -> роль колонки
+_ROLES = {'давлен': 'p', 'температур': 't'}
+
+
+# Подпись для сравнения: без регистра, лишних пробелов, двоеточия в конце и с «е» вместо «ё»
+def normalize_label(label):
+    label = ' '.join(str(label).split()).lower().replace('ё', 'е')
+    return label.rstrip(' :')
+
+
+def _prefix_match(text, prefixes):
+    for prefix, name in prefixes.items():
+        if text.startswith(prefix):
+            return name
+    return None
+
+
+def _column_index(column):
+    index = 0
+    for char in column.upper():
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+# Индекс листа параметров: строится за один проход по строкам листа
+class ParameterIndex:
+    def __init__(self, rows, merged_ranges=()):
+        # (таблица, подпись) -> [строки]; первая строка - строка с подписью, далее строки продолжения
+        self.labels = {}
+        # (таблица, условие, роль) -> значения колонок роли
+        self.conditions = {}
+
+        # Ширина объединённых ячеек: (строка, колонка) с нуля -> число колонок
+        spans = {(min_row - 1, min_col - 1): max_col - min_col + 1
+                 for min_col, min_row, max_col, _ in merged_ranges}
+
+        table = None
+        table_has_conditions = False
+        last_rows = None
+        roles = None
+        for row_number, row in enumerate(rows):
+            label = row[0] if row else None
+            if label is None or str(label).strip() == '':
+                # Строка продолжения подписанной строки (например, второй расход сырья)
+                if last_rows is not None and any(value is not None for value in row[1:]):
+                    last_rows.append(row)
+                else:
+                    last_rows = None
+                    roles = None
+                continue
+
+            text = normalize_label(label)
+            title = _TABLE_TITLE.match(text)
+            if title:
+                table = int(title.group(1))
+                table_has_conditions = False
+                last_rows = None
+                roles = None
+                continue
+
+            if text == _CONDITIONS_HEADER:
+                # Таблица условий без заголовка «Таблица N» идёт следующим номером
+                if table_has_conditions:
+                    table = (table or 0) + 1
+                table_has_conditions = True
+                roles = {}
+                for column, header in enumerate(row):
+                    role = _prefix_match(normalize_label(header), _ROLES) if header is not None else None
+                    if role is not None:
+                        span = spans.get((row_number, column), 1)
+                        roles[role] = list(range(column, column + span))
+                last_rows = None
+                continue
+
+            condition = _prefix_match(text, _CONDITIONS) if roles is not None else None
+            if condition is not None:
+                for role, columns in roles.items():
+                    self.conditions[(table, condition, role)] = [row[column] if column < len(row) else None
+                                                                 for column in columns]
+                last_rows = None
+                continue
+
+            last_rows = [row]
+            self.labels.setdefault((table, text), last_rows)
+            self.labels.setdefault((None, text), last_rows)
+
+    def value(self, location):
+        if isinstance(location, Cell):
+            rows = self.labels.get((location.table, normalize_label(location.label)))
+            if rows is None:
+                raise ParameterError(f'На листе параметров нет строки «{location.label}»'
+                                     + (f' в таблице {location.table}' if location.table is not None else ''))
+            if location.row >= len(rows):
+                raise ParameterError(f'У строки «{location.label}» нет строки продолжения № {location.row}')
+            row = rows[location.row]
+            column = _column_index(location.column)
+            value = row[column] if column < len(row) else None
+        else:
+            values = self.conditions.get((location.table, location.condition, location.role))
+            if values is None or location.index >= len(values):
+                raise ParameterError(f'В таблице {location.table} листа параметров нет значения '
+                                     f'{location.condition}/{location.role}')
+            value = values[location.index]
+
+        if value is None:
+            raise ParameterError(f'Пустое значение параметра: {location}')
+        return value if location.type is None else location.type(value)
+
+
+# Параметры документа: атрибуты с именами из PARAMETERS
+class DocumentParameters:
+    __slots__ = tuple(PARAMETERS)
+
+    def __init__(self, index):
+        for name, location in PARAMETERS.items():
+            setattr(self, name, index.value(location))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Параметры из книги filename; строки листа читаются потоком, без загрузки всей книги
+def load_parameters(filename, sheet_name='1', cache=workbook.cache):
+    return DocumentParameters(ParameterIndex(cache.iter_rows(filename, sheet_name),
+                                             cache.merged_ranges(filename, sheet_name)))
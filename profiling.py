@@ -0,0 +1,159 @@
+import atexit
+import cProfile
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Необязательные замеры сборки документа. Включаются переменной окружения BD_PROFILE=<префикс файлов>:
+#   BD_PROFILE=out python bd.py
+# Участки сборки (чтение листов, таблицы, заголовки, разделы, главы, doc.save) оборачиваются в span();
+# по завершении процесса в stderr выводится сводка (число вызовов, время, пиковая память, элементы XML глав),
+# а участки и профиль cProfile записываются в <префикс>.speedscope.json (https://www.speedscope.app)
+# и <префикс>.prof (python -m pstats, snakeviz). Без BD_PROFILE span() ничего не делает
+
+# Пиковый размер памяти процесса в байтах (ru_maxrss - в КиБ в Linux, в байтах в macOS)
+def peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'label', 'attrs', 'start')
+
+    def __init__(self, profiler, name, label):
+        self.profiler = profiler
+        self.name = name
+        self.label = label
+        self.attrs = {}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.profiler._events.append(('O', self.frame, self.start))
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.profiler._events.append(('C', self.frame, end))
+        self.profiler._finish(self, end - self.start)
+        return False
+
+    @property
+    def frame(self):
+        return self.name if self.label is None else f'{self.name}: {self.label}'
+
+
+class _NullSpan:
+    __slots__ = ('attrs',)
+
+    def __init__(self):
+        self.attrs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Profiler:
+    def __init__(self, cprofile=True):
+        self.start = time.perf_counter()
+        # Участок -> [число вызовов, суммарное время, наибольшее время]
+        self.totals = {}
+        # Участки с подписью (главы): (имя, подпись, время, пиковая память, атрибуты)
+        self.labelled = []
+        self._events = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def span(self, name, label=None):
+        return _Span(self, name, label)
+
+    def _finish(self, span, seconds):
+        totals = self.totals.setdefault(span.name, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+        if span.label is not None:
+            self.labelled.append((span.name, span.label, seconds, peak_rss(), span.attrs))
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def report(self):
+        lines = [f"{'участок':<32} {'вызовов':>8} {'всего, с':>10} {'макс., с':>10}"]
+        for name, (count, total, longest) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f'{name:<32} {count:>8} {total:10.4f} {longest:10.4f}')
+        if self.labelled:
+            lines.append('')
+            lines.append(f"{'участок':<48} {'время, с':>10} {'пик RSS, МиБ':>13}  атрибуты")
+            for name, label, seconds, rss, attrs in self.labelled:
+                rss_text = f'{rss / 2 ** 20:13.1f}' if rss is not None else f"{'-':>13}"
+                attrs_text = ', '.join(f'{key}={value}' for key, value in attrs.items())
+                lines.append(f'{f"{name}: {label}"[:48]:<48} {seconds:10.4f} {rss_text}  {attrs_text}')
+        rss = peak_rss()
+        lines.append('')
+        lines.append(f'всего {time.perf_counter() - self.start:.4f} с'
+                     + (f', пик RSS {rss / 2 ** 20:.1f} МиБ' if rss is not None else ''))
+        return '\n'.join(lines)
+
+    # Участки в формате speedscope (evented profile): время в секундах от начала замера
+    def write_speedscope(self, filename, name='bd'):
+        frames = {}
+        events = []
+        for event_type, frame, at in self._events:
+            index = frames.setdefault(frame, len(frames))
+            events.append({'type': event_type, 'frame': index, 'at': at - self.start})
+        end = max((event['at'] for event in events), default=0.0)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'$schema': 'https://www.speedscope.app/file-format-schema.json',
+                       'shared': {'frames': [{'name': frame} for frame in frames]},
+                       'profiles': [{'type': 'evented', 'name': name, 'unit': 'seconds',
+                                     'startValue': 0.0, 'endValue': end, 'events': events}],
+                       'exporter': 'profiling.py'}, f, ensure_ascii=False)
+
+    def write_cprofile(self, filename):
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(filename)
+
+
+_NULL_SPAN = _NullSpan()
+profiler = None
+
+
+# Участок сборки: with span('add_table'): ...; подпись label выделяет отдельные участки (например, главы)
+# в сводке. span.attrs - дополнительные значения для сводки
+def span(name, label=None):
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, label)
+
+
+def enable(prefix, cprofile=True):
+    global profiler
+    profiler = Profiler(cprofile)
+    atexit.register(_write_results, profiler, prefix)
+    return profiler
+
+
+def _write_results(active_profiler, prefix):
+    active_profiler.stop()
+    print(active_profiler.report(), file=sys.stderr)
+    name = os.path.basename(sys.argv[0]) or 'python'
+    active_profiler.write_speedscope(f'{prefix}.speedscope.json', name)
+    active_profiler.write_cprofile(f'{prefix}.prof')
+    print(f'Профиль: {prefix}.speedscope.json, {prefix}.prof', file=sys.stderr)
+
+
+if os.environ.get('BD_PROFILE'):
+    enable(os.environ['BD_PROFILE'])
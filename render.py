@@ -0,0 +1,564 @@
+import copy
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from docx.oxml import OxmlElement
+from docx.shared import Pt, Cm, Emu
+from docx.oxml.ns import qn
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.enum.section import WD_SECTION, WD_ORIENT
+from docx.enum.style import WD_STYLE_TYPE
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from numbering import Numbering
+from spec import Paragraphs, SheetTable, ReservedTable, NewSection, Custom, Template
+from styles import BODY_CHAR_STYLE, BODY_STYLE, TABLE_12PT_STYLE, PARAGRAPH_STYLES
+from tables import (add_fast_table, estimate_row_height, merge_cells, proportional_widths, row_values, set_header_rows,
+                    store_row_values, store_text_widths, text_lines, text_widths)
+from templates import compile_template
+import profiling
+import workbook
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Функции
+
+def set_font(run, font_name, font_size, italic=False, bold=False):
+    run.font.name = font_name
+    run.font.size = Pt(font_size)
+    run.font.italic = italic
+    run.font.bold = bold
+    # Это нужно для корректного отображения шрифта на всех платформах
+    run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+
+
+# Готовые свойства абзаца w:pPr: (параметры set_paragraph_format, исходный w:pPr) -> w:pPr после форматирования.
+# Различных сочетаний немного, поэтому каждое оформляется через python-docx один раз, а дальше копируется
+_paragraph_formats = {}
+
+
+def set_paragraph_format(paragraph, left_indent=0, right_indent=0, first_line_indent=1.25, line_spacing=22,
+                         space_after=0, space_before=0):
+    p = paragraph._p
+    pPr = p.pPr
+    key = (left_indent, right_indent, first_line_indent, line_spacing, space_after, space_before,
+           None if pPr is None else etree.tostring(pPr))
+    template = _paragraph_formats.get(key)
+    if template is not None:
+        if pPr is None:
+            p.insert(0, copy.deepcopy(template))
+        else:
+            p.replace(pPr, copy.deepcopy(template))
+        return
+
+    paragraph_format = paragraph.paragraph_format
+    paragraph_format.left_indent = Cm(left_indent)
+    paragraph_format.right_indent = Cm(right_indent)
+    paragraph_format.first_line_indent = Cm(first_line_indent)
+    paragraph_format.line_spacing = Pt(line_spacing)
+    paragraph_format.space_after = Cm(space_after)
+    paragraph_format.space_before = Cm(space_before)
+    _paragraph_formats[key] = copy.deepcopy(p.pPr)
+
+
+def add_header(doc, header_text):
+    with profiling.span('add_header'):
+        paragraph = doc.add_paragraph()
+        paragraph.add_run(header_text, style=BODY_CHAR_STYLE)
+        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+
+
+def add_heading(doc, text):
+    heading = doc.add_heading(text, level=1)
+    heading.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+    for run in heading.runs:
+        set_font(run, 'Times New Roman', 14)
+        set_paragraph_format(heading, left_indent=0.0, right_indent=0.0, first_line_indent=1.25, line_spacing=22,
+                             space_after=0, space_before=0)
+
+
+# Шаблоны абзацев add_paragraphs: id стиля -> (пустой w:p со стилем, w:p со стилем и прогоном с пустым w:t)
+_paragraph_templates = {}
+
+
+def _paragraph_template(style_id):
+    if style_id not in _paragraph_templates:
+        empty_p = OxmlElement('w:p')
+        empty_p.style = style_id
+        text_p = copy.deepcopy(empty_p)
+        text_p.add_r().add_t('')
+        _paragraph_templates[style_id] = empty_p, text_p
+    return _paragraph_templates[style_id]
+
+
+# Абзацы lines стиля style одним проходом: стиль ищется один раз, каждый w:p - копия готового шаблона,
+# в которой меняется только текст. Строки с табуляцией или переводом строки (w:tab, w:br) добавляет python-docx
+def add_paragraphs(doc, lines, style=BODY_STYLE):
+    empty_p, text_p = _paragraph_template(doc.part.get_style_id(style, WD_STYLE_TYPE.PARAGRAPH))
+    sectPr = doc.element.body.sectPr
+    for line in lines:
+        if not line:
+            sectPr.addprevious(copy.deepcopy(empty_p))
+        elif '\t' in line or '\n' in line or '\r' in line:
+            doc.add_paragraph(line, style=style)
+        else:
+            p = copy.deepcopy(text_p)
+            t = p[-1][-1]
+            t.text = line
+            if len(line.strip()) < len(line):
+                t.set(qn('xml:space'), 'preserve')
+            sectPr.addprevious(p)
+
+
+# Высота пустого абзаца-отступа в пунктах (точный междустрочный интервал стиля из PARAGRAPH_STYLES);
+# None - элемент не пустой абзац такого стиля
+def _blank_height(element, heights):
+    if element.tag != qn('w:p') or len(element) != 1 or element.pPr is None or len(element.pPr) != 1:
+        return None
+    return heights.get(element.pPr.style)
+
+
+# Абзац, к которому можно добавить интервал: не разрыв раздела и не разрыв страницы
+def _can_take_spacing(element):
+    return (element is not None and element.tag == qn('w:p') and (element.pPr is None or element.pPr.sectPr is None)
+            and not element.xpath('./w:r/w:br[@w:type="page"]'))
+
+
+# Серии пустых абзацев-отступов среди elements заменяются интервалом той же высоты: после предыдущего абзаца,
+# а если перед серией таблица или разрыв - перед следующим. Серия между двумя таблицами остаётся как есть
+def compact_spacing(doc, elements):
+    heights = {doc.styles[name].style_id: line_spacing
+               for name, (_, _, line_spacing) in PARAGRAPH_STYLES.items() if name in doc.styles}
+    elements = list(elements)
+    start = 0
+    while start < len(elements):
+        end = start
+        height = 0
+        while end < len(elements):
+            blank_height = _blank_height(elements[end], heights)
+            if blank_height is None:
+                break
+            height += blank_height
+            end += 1
+        if end == start:
+            start += 1
+            continue
+
+        previous = elements[start - 1] if start > 0 else None
+        following = elements[end] if end < len(elements) else None
+        if _can_take_spacing(previous):
+            paragraph_format = Paragraph(previous, None).paragraph_format
+            paragraph_format.space_after = Pt((paragraph_format.space_after or Pt(0)).pt + height)
+        elif _can_take_spacing(following):
+            paragraph_format = Paragraph(following, None).paragraph_format
+            paragraph_format.space_before = Pt((paragraph_format.space_before or Pt(0)).pt + height)
+        else:
+            start = end
+            continue
+        for element in elements[start:end]:
+            element.getparent().remove(element)
+        start = end
+
+
+# Оформление абзаца ячейки таблицы
+def format_table_paragraph(paragraph):
+    paragraph.style = TABLE_12PT_STYLE
+
+
+def add_table(doc, sheet, start_row, end_row, merged_ranges, include_header=True, font_metrics=False,
+              total_width=Cm(25.5)):
+    with profiling.span('add_table'):
+        return _add_table(doc, sheet, start_row, end_row, merged_ranges, include_header, font_metrics, total_width)
+
+
+def _add_table(doc, sheet, start_row, end_row, merged_ranges, include_header, font_metrics, total_width):
+    # Ширины колонок считаются один раз по всему листу и одинаковы во всех частях таблицы
+    col_widths = proportional_widths(text_widths(sheet, 12 if font_metrics else None), total_width)
+
+    # Строки таблицы собираются из шаблонов ячеек, оформленных один раз
+    header = [str(column_name) for column_name in sheet.columns] if include_header else None
+    rows = row_values(sheet)[start_row:end_row]
+    table = add_fast_table(doc, rows, len(sheet.columns), format_table_paragraph, col_widths, header)
+
+    # Корректировка для индексации строк
+    header_offset = 1 if include_header else 0
+
+    # Обработка объединённых ячеек: строки листа начинаются с Excel строки 2 и индексируется с 0,
+    # заголовок таблицы - Excel строка 1. Выбираются только диапазоны текущей части таблицы
+    merged_cells = []
+    if include_header:
+        merged_cells += merge_cells(table, merged_ranges.spans(-1, 0, row_offset=2))
+    merged_cells += merge_cells(table, merged_ranges.spans(start_row, end_row, row_offset=2), row_shift=header_offset)
+
+    for start_cell in merged_cells:
+        # Удаляем лишние пустые параграфы из объединенной ячейки (хотя бы один параграф в ячейке остаётся)
+        paragraphs = start_cell.paragraphs
+        empty_paragraphs = [paragraph for paragraph in paragraphs if not paragraph.text.strip()]
+        if len(empty_paragraphs) == len(paragraphs):
+            empty_paragraphs = empty_paragraphs[1:]
+        for paragraph in empty_paragraphs:
+            p = paragraph._element
+            p.getparent().remove(p)
+
+    return table
+
+
+def insert_page_break(doc):
+    doc.add_page_break()
+
+
+# Новый раздел с новой страницы книжной или альбомной ориентации
+def add_section(doc, landscape=False):
+    with profiling.span('add_section'):
+        new_section = doc.add_section(WD_SECTION.NEW_PAGE)
+        new_section.orientation = WD_ORIENT.LANDSCAPE if landscape else WD_ORIENT.PORTRAIT
+
+        # Убедимся, что размеры страницы соответствуют ориентации
+        if (new_section.page_width > new_section.page_height) != landscape:
+            new_section.page_width, new_section.page_height = new_section.page_height, new_section.page_width
+
+
+# Части таблицы [(start_row, end_row), ...] по rows_per_page_first / rows_per_page_next строк
+def _fixed_parts(total_rows, block):
+    parts = [(0, min(block.rows_per_page_first, total_rows))]
+    while parts[-1][1] < total_rows:
+        start_row = parts[-1][1]
+        parts.append((start_row, min(start_row + block.rows_per_page_next, total_rows)))
+    return parts
+
+
+# Оценка высоты абзаца основного текста (14 пт, интервал 22 пт) в пунктах
+def _paragraph_height(text, text_width):
+    font_size, _, line_spacing = PARAGRAPH_STYLES[BODY_STYLE]
+    return text_lines(text, text_width, font_size) * line_spacing
+
+
+# Оценка высоты, уже занятой на текущей странице: элементы документа после последнего разрыва страницы
+# или начала раздела с новой страницы. Содержимое длиннее страницы переносится: берётся остаток от деления
+# на высоту страницы page_height. Текст - только из w:t (itertext() без тега повторяет текст абзаца
+# трижды: w:p, w:r и w:t в python-docx переопределяют .text)
+def _current_page_height(doc, text_width, page_height):
+    body = doc.element.body
+    font_size, _, line_spacing = PARAGRAPH_STYLES[TABLE_12PT_STYLE]
+    height = 0.0
+    for element in reversed(body[:len(body) - 1]):
+        if element.tag == qn('w:p'):
+            if element.xpath('./w:r/w:br[@w:type="page"]'):
+                break
+            section_type = element.xpath('./w:pPr/w:sectPr/w:type/@w:val')
+            if element.xpath('./w:pPr/w:sectPr') and section_type != ['continuous']:
+                break
+            height += _paragraph_height(''.join(element.itertext(qn('w:t'))), text_width)
+        elif element.tag == qn('w:tbl'):
+            for tr in element.iter(qn('w:tr')):
+                tcs = tr.tc_lst
+                widths = [tc.width or Pt(text_width / len(tcs)) for tc in tcs]
+                height += estimate_row_height([''.join(tc.itertext(qn('w:t'))) for tc in tcs], widths, font_size,
+                                              line_spacing)
+    return height % page_height
+
+
+# Разбиение строк высотой heights на части: первая часть вмещает available пунктов, следующие - next_available.
+# Таблица не разрывается внутри вертикально объединённых ячеек (joined - строки-продолжения), если перед ними
+# в части есть другие строки
+def _split_rows(heights, joined, available, next_available):
+    parts = []
+    start_row = 0
+    used = 0.0
+    for row, height in enumerate(heights):
+        if used + height > available and row > start_row:
+            split = row
+            while split > start_row + 1 and split in joined:
+                split -= 1
+            if split in joined:
+                split = row
+            parts.append((start_row, split))
+            start_row = split
+            used = sum(heights[split:row])
+            available = next_available
+        used += height
+    parts.append((start_row, len(heights)))
+    return parts
+
+
+# Части таблицы по оценке высоты строк: первая часть занимает остаток текущей страницы, следующие - страницу
+# целиком (за вычетом подписи «Продолжение таблицы» и строки заголовков колонок).
+# Возвращает (части, new_page): new_page - таблица начинается с новой страницы, потому что на текущей
+# не помещаются подпись, строка заголовков и первая строка или первая часть вышла бы из одной строки
+def _auto_parts(doc, sheet, merged_ranges, block, total_width, header_text_first, header_text_next,
+                include_header_next):
+    section = doc.sections[-1]
+    page_height = Emu(section.page_height - section.top_margin - section.bottom_margin).pt
+    text_width = Emu(section.page_width - section.left_margin - section.right_margin).pt
+
+    font_size, _, line_spacing = PARAGRAPH_STYLES[TABLE_12PT_STYLE]
+    col_widths = proportional_widths(text_widths(sheet, 12 if block.font_metrics else None), total_width)
+    heights = [estimate_row_height(values, col_widths, font_size, line_spacing) for values in row_values(sheet)]
+    header_height = estimate_row_height([str(column_name) for column_name in sheet.columns], col_widths, font_size,
+                                        line_spacing)
+
+    # Строки, перед которыми таблицу разрывать нельзя (продолжение вертикально объединённой ячейки)
+    joined = {row for top, _, bottom, _ in merged_ranges.spans(0, len(sheet), row_offset=2)
+              for row in range(top + 1, bottom + 1)}
+
+    first_page = (page_height - _paragraph_height(header_text_first, text_width)
+                  - (header_height if block.include_header else 0))
+    next_available = (page_height - _paragraph_height(header_text_next, text_width)
+                      - (header_height if include_header_next else 0))
+    current_height = _current_page_height(doc, text_width, page_height)
+
+    available = first_page - current_height
+    parts = _split_rows(heights, joined, available, next_available)
+    new_page = current_height > 0 and bool(heights) and (heights[0] > available or len(parts) > 1
+                                                        and parts[0][1] - parts[0][0] == 1)
+    if new_page:
+        parts = _split_rows(heights, joined, first_page, next_available)
+    return parts, new_page
+
+
+def _header_texts(number, block):
+    return f'Таблица {number} – {block.title}', f'Продолжение таблицы {number} – {block.title}'
+
+
+def _include_header_next(block):
+    return block.include_header if block.include_header_next is None else block.include_header_next
+
+
+# Части, на которые add_paginated_table разбила бы таблицу листа в конце документа doc (документ не меняется).
+# Возвращает (части [(start_row, end_row), ...], new_page): new_page - первая часть начинается с новой страницы
+def plan_table_parts(doc, sheet, merged_ranges, number, block, total_width=Cm(25.5)):
+    if block.pagination == 'repeat_header':
+        return [(0, len(sheet))], False
+    if block.pagination == 'rows':
+        return _fixed_parts(len(sheet), block), False
+    if block.pagination == 'auto':
+        return _auto_parts(doc, sheet, merged_ranges, block, total_width, *_header_texts(number, block),
+                           _include_header_next(block))
+    raise ValueError(f'Неизвестный способ разбиения таблицы {block.id}: {block.pagination}')
+
+
+# Таблица листа, разбитая на части (block.pagination, см. plan_table_parts): первая с заголовком «Таблица ...»,
+# остальные с новой страницы. При 'repeat_header' таблица одна, строки заголовка повторяет Word.
+# Возвращает части [(start_row, end_row), ...]
+def add_paginated_table(doc, sheet, merged_ranges, number, block, total_width):
+    header_text_first, header_text_next = _header_texts(number, block)
+    include_header_next = _include_header_next(block)
+    parts, new_page = plan_table_parts(doc, sheet, merged_ranges, number, block, total_width)
+
+    if block.pagination == 'repeat_header':
+        add_header(doc, header_text_first)
+        table = add_table(doc, sheet, 0, len(sheet), merged_ranges, include_header=block.include_header,
+                          font_metrics=block.font_metrics, total_width=total_width)
+        header_rows = (1 if block.include_header else 0) if block.header_rows is None else block.header_rows
+        set_header_rows(table, header_rows)
+        return parts
+
+    for index, (start_row, end_row) in enumerate(parts):
+        if index == 0:
+            # Первая таблица с заголовком
+            if new_page:
+                insert_page_break(doc)
+            add_header(doc, header_text_first)
+            include_header = block.include_header
+        else:
+            # Последующие таблицы
+            insert_page_break(doc)
+            add_header(doc, header_text_next)
+            include_header = include_header_next
+        add_table(doc, sheet, start_row, end_row, merged_ranges, include_header=include_header,
+                  font_metrics=block.font_metrics, total_width=total_width)
+    return parts
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Компиляция и построение документа по описанию
+
+# Результат компиляции описания: номера глав, номера таблиц по id и листы, которые нужно прочитать
+# (всего документа и каждой главы); reused_chapters - главы, взятые из кэша сборки
+@dataclass
+class CompiledDocument:
+    spec: object
+    chapter_numbers: list
+    table_numbers: dict
+    sheets: list = field(default_factory=list)
+    chapter_sheets: list = field(default_factory=list)
+    reused_chapters: list = field(default_factory=list)
+
+
+# Первый проход: номера глав и таблиц (numbering.Number) назначаются до построения документа, поэтому текст может
+# ссылаться на таблицу, которая выводится ниже, а главы строятся независимо друг от друга (из кэша сборки,
+# в любом порядке). Заодно собирается список всех листов документа
+def compile_spec(spec, database_file):
+    numbering = Numbering()
+
+    compiled = CompiledDocument(spec, [], {})
+    for chapter in spec.chapters:
+        compiled.chapter_numbers.append(None if chapter.title is None else numbering.heading())
+        chapter_sheets = []
+        for block in chapter.blocks:
+            if isinstance(block, (SheetTable, ReservedTable)):
+                compiled.table_numbers[block.id] = numbering.next('table')
+            if isinstance(block, SheetTable):
+                key = (block.filename or database_file, block.sheet)
+                if key not in chapter_sheets:
+                    chapter_sheets.append(key)
+                if key not in compiled.sheets:
+                    compiled.sheets.append(key)
+        compiled.chapter_sheets.append(chapter_sheets)
+    return compiled
+
+
+# Параметры документа для шаблонов текста; с кэшем сборки пересчитываются только при изменении листа параметров
+def document_parameters(spec, database_file, build_cache=None):
+    if spec.parameters is None:
+        return {}
+    if build_cache is None:
+        return spec.parameters(database_file)
+
+    key = build_cache.key('parameters', inspect.getsource(spec.parameters),
+                          build_cache.sheet_digest(database_file, spec.parameters_sheet))
+    parameters = build_cache.load_value(key)
+    if parameters is None:
+        parameters = spec.parameters(database_file)
+        build_cache.store_value(key, parameters)
+    return parameters
+
+
+# compact - пустые абзацы-отступы главы заменяются интервалами (compact_spacing)
+def render_chapter(doc, chapter, number, sheets, context, database_file, total_width, build_cache=None,
+                   compact=False):
+    body = doc.element.body
+    first = len(body) - 1
+    if chapter.new_section:
+        add_section(doc)
+    if number is not None:
+        add_heading(doc, f'{number} {chapter.title}')
+
+    for block in chapter.blocks:
+        if isinstance(block, Paragraphs):
+            add_paragraphs(doc, [line.format(**context) for line in block.lines], block.style)
+        elif isinstance(block, SheetTable):
+            sheet, merged_ranges = sheets[(block.filename or database_file, block.sheet)]
+            add_paginated_table(doc, sheet, merged_ranges, context[block.id], block, total_width)
+        elif isinstance(block, NewSection):
+            add_section(doc, block.landscape)
+        elif isinstance(block, Custom):
+            block.func(doc, context)
+        elif isinstance(block, Template):
+            with profiling.span('template', block.func.__name__):
+                fields = context if block.fields is None else dict(context, **block.fields(context))
+                for element in compile_template(block.func, body.sectPr, build_cache).clone(fields):
+                    body.sectPr.addprevious(element)
+
+    if compact:
+        compact_spacing(doc, body[first:len(body) - 1])
+
+
+# Ключ фрагмента главы в кэше сборки: всё, от чего зависит XML главы, включая свойства раздела
+# (w:sectPr), в котором глава начинается. Главы с Custom строятся кодом и не кэшируются, главы с Template
+# тоже (поля шаблона, например дата, меняются от сборки к сборке, а сам шаблон и так копируется готовым)
+def _chapter_key(build_cache, doc, chapter, number, chapter_sheets, context, spec):
+    if any(isinstance(block, (Custom, Template)) for block in chapter.blocks):
+        return None
+    return build_cache.key('chapter', etree.tostring(doc.element.body.sectPr), repr(chapter), number,
+                           repr(sorted(context.items())), spec.table_width_cm, spec.compact_spacing,
+                           [(sheet_name, build_cache.sheet_digest(filename, sheet_name))
+                            for filename, sheet_name in chapter_sheets])
+
+
+# Число элементов XML во фрагменте (для сводки замеров)
+def _element_count(elements):
+    return sum(1 for element in elements for _ in element.iter())
+
+
+# Сессия чтения книг процесса пула (_init_worker): каждая книга разбирается в процессе один раз,
+# сколько бы её листов ни досталось этому процессу
+_worker_cache = None
+
+
+def _init_worker(engine):
+    global _worker_cache
+    _worker_cache = workbook.WorkbookCache(engine)
+
+
+# Подготовка листа в процессе пула: чтение листа с объединёнными ячейками, ширины колонок для кеглей
+# font_sizes (None - по числу символов) и строки таблицы
+def _prepare_sheet(filename, sheet_name, font_sizes):
+    sheet, merged_ranges = _worker_cache.read_excel_with_merged_cells(filename, sheet_name)
+    widths = {font_size: text_widths(sheet, font_size) for font_size in font_sizes}
+    return sheet, merged_ranges, widths, row_values(sheet)
+
+
+# Кегли, для которых таблицам документа нужны ширины колонок (см. text_widths)
+def _width_font_sizes(spec):
+    return {12 if block.font_metrics else None
+            for chapter in spec.chapters for block in chapter.blocks if isinstance(block, SheetTable)}
+
+
+# Листы keys [(filename, sheet_name), ...], подготовленные заранее: непрочитанные листы читаются параллельно
+# в jobs процессах (None - по числу ядер, 1 - последовательно в текущем процессе), результаты попадают в cache
+# вместе с ширинами колонок для кеглей font_sizes и строками таблиц. Процессу документа остаётся только
+# собирать таблицы из готовых строк
+def prefetch_sheets(keys, cache=workbook.cache, jobs=1, font_sizes=(None,)):
+    missing = [key for key in keys if not cache.has_sheet(*key)]
+    if jobs != 1 and len(missing) > 1:
+        with profiling.span('prefetch_sheets'), ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                                                    initargs=(cache.engine,)) as executor:
+            futures = {key: executor.submit(_prepare_sheet, *key, font_sizes) for key in missing}
+            for (filename, sheet_name), future in futures.items():
+                sheet, merged_ranges, widths, rows = future.result()
+                cache.add_sheet(filename, sheet_name, sheet, merged_ranges)
+                for font_size, font_widths in widths.items():
+                    store_text_widths(sheet, font_size, font_widths)
+                store_row_values(sheet, rows)
+    return cache.read_sheets(keys)
+
+
+# Построение документа по описанию spec.
+# Без кэша сборки все листы готовятся до начала построения (jobs - число процессов для этого, см. prefetch_sheets).
+# С кэшем сборки (build_cache.BuildCache) главы, входные данные которых не изменились, вставляются
+# готовыми XML-фрагментами, а листы читаются только для глав, которые строятся заново
+def render_document(doc, spec, database_file, cache=workbook.cache, build_cache=None, jobs=1):
+    compiled = compile_spec(spec, database_file)
+    context = dict(document_parameters(spec, database_file, build_cache), **compiled.table_numbers)
+    total_width = Cm(spec.table_width_cm)
+    body = doc.element.body
+
+    if build_cache is None:
+        sheets = prefetch_sheets(compiled.sheets, cache, jobs, _width_font_sizes(spec))
+        for chapter, number in zip(spec.chapters, compiled.chapter_numbers):
+            first = len(body) - 1
+            with profiling.span('chapter', chapter.title or '(без заголовка)') as chapter_span:
+                render_chapter(doc, chapter, number, sheets, context, database_file, total_width,
+                               compact=spec.compact_spacing)
+            if profiling.profiler is not None:
+                chapter_span.attrs['xml_elements'] = _element_count(body[first:len(body) - 1])
+        return compiled
+
+    for index, (chapter, number, chapter_sheets) in enumerate(zip(spec.chapters, compiled.chapter_numbers,
+                                                                  compiled.chapter_sheets)):
+        first = len(body) - 1
+        with profiling.span('chapter', chapter.title or '(без заголовка)') as chapter_span:
+            key = _chapter_key(build_cache, doc, chapter, number, chapter_sheets, context, spec)
+            fragment = None if key is None else build_cache.load_fragment(key)
+
+            if fragment is not None:
+                elements, sectPr = fragment
+                for element in elements:
+                    body.sectPr.addprevious(element)
+                body.replace(body.sectPr, sectPr)
+                compiled.reused_chapters.append(index)
+            else:
+                # Новые элементы главы добавляются перед итоговым w:sectPr документа
+                sheets = prefetch_sheets(chapter_sheets, cache, jobs, _width_font_sizes(spec))
+                render_chapter(doc, chapter, number, sheets, context, database_file, total_width, build_cache,
+                               spec.compact_spacing)
+                if key is not None:
+                    build_cache.store_fragment(key, body[first:len(body) - 1], body.sectPr)
+
+        if profiling.profiler is not None:
+            chapter_span.attrs['xml_elements'] = _element_count(body[first:len(body) - 1])
+            chapter_span.attrs['cached'] = fragment is not None
+
+    return compiled
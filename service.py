@@ -0,0 +1,168 @@
+import argparse
+import os
+import socketserver
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+# Библиотеки и генераторы импортируются один раз при запуске сервиса, а не при каждой сборке
+import bd
+import dev_ol
+import flows
+import workbook
+from output import ChunkWriter
+
+# Резидентный сервис сборки документов. Исходные книги Excel разбираются один раз и остаются в
+# workbook.cache; перед каждой сборкой книги, изменённые на диске (время изменения или размер), сбрасываются.
+#   python service.py [--host 127.0.0.1] [--port 8765] [--socket /tmp/bd.sock] [--data-dir .] [--engine xml]
+#                     [--preload ...]
+# Запросы (GET, параметры необязательны):
+#   /bp?database=database.xlsx           Базовый проект (bd.py)
+#   /flows?term=term.xlsx                Таблицы потоков (flows.py)
+#   /ol?device=database/device/1.xlsx    Опросный лист (dev_ol.py)
+# Пути книг отсчитываются от каталога данных --data-dir; пути вне него (абсолютные, через .. или по ссылкам)
+# отклоняются. Общий параметр compress=0-9 - степень сжатия .docx.
+# Запросы обслуживаются в отдельных потоках, но документы собираются по одному (кэш книг и python-docx
+# общие для процесса). Собранный документ отдаётся кусками (Transfer-Encoding: chunked) уже после сборки,
+# вне блокировки: медленный клиент не задерживает сборку документов для других. На диск ничего не пишется.
+#   curl -o БП.docx 'http://127.0.0.1:8765/bp?database=database.xlsx'
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Документ -> (имя файла в ответе, параметр запроса с исходной книгой и её значение по умолчанию,
+# сборка build(filename, sink, compresslevel))
+DOCUMENTS = {
+    '/bp': ('БП.docx', 'database', 'database.xlsx',
+            lambda filename, sink, compresslevel: bd.create_document(filename, sink, compresslevel=compresslevel)),
+    '/flows': ('потоки.docx', 'term', 'term.xlsx', flows.create_document),
+    '/ol': ('ОЛ #1.docx', 'device', 'database/device/1.xlsx',
+            lambda filename, sink, compresslevel: dev_ol.create_document(sink, compresslevel, filename)),
+}
+
+
+# Сборка документов по одному: workbook.cache и генераторы не рассчитаны на одновременные сборки
+_build_lock = threading.Lock()
+
+
+# Путь книги filename внутри каталога данных data_dir; None - путь ведёт за пределы каталога
+def resolve_data_path(data_dir, filename):
+    root = os.path.realpath(data_dir)
+    path = os.path.realpath(os.path.join(root, filename))
+    return path if os.path.commonpath([root, path]) == root else None
+
+
+class DocumentRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    data_dir = '.'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path not in DOCUMENTS:
+            self._send_error(404, f'Неизвестный документ: {url.path}. Доступны: {", ".join(DOCUMENTS)}')
+            return
+        download_name, parameter, default_file, build = DOCUMENTS[url.path]
+        query = parse_qs(url.query)
+        filename = query.get(parameter, [default_file])[0]
+        compress = query.get('compress', [None])[0]
+        if compress is not None and compress not in [str(level) for level in range(10)]:
+            self._send_error(400, f'compress - число от 0 до 9, получено: {compress}')
+            return
+        path = resolve_data_path(self.data_dir, filename)
+        if path is None:
+            self._send_error(403, f'Файл {filename} вне каталога данных')
+            return
+        if not os.path.isfile(path):
+            self._send_error(404, f'Файл {filename} не найден')
+            return
+
+        start = time.perf_counter()
+        chunks = []
+        try:
+            with _build_lock:
+                changed = workbook.cache.refresh()
+                writer = ChunkWriter(chunks.append)
+                build(path, writer, None if compress is None else int(compress))
+                writer.flush()
+        except Exception as e:
+            traceback.print_exc()
+            self._send_error(500, f'{type(e).__name__}: {e}')
+            return
+        build_seconds = time.perf_counter() - start
+
+        self._send_headers(download_name)
+        for chunk in chunks:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+        self.log_message('%s собран за %.2f с%s', url.path, build_seconds,
+                         f' (перечитаны: {", ".join(changed)})' if changed else '')
+
+    def _send_headers(self, download_name):
+        self.send_response(200)
+        self.send_header('Content-Type', DOCX_CONTENT_TYPE)
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(download_name)}")
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _send_error(self, code, message):
+        body = message.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Для Unix-сокета адрес клиента - пустая строка
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+# HTTP-сервер на Unix-сокете: доступен только локальным процессам с правами на файл сокета
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сервис сборки документов: БП, потоки, ОЛ по HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='адрес (по умолчанию только локальный)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', default=None, help='Unix-сокет вместо TCP-порта')
+    parser.add_argument('--data-dir', default='.', help='каталог исходных книг: пути в запросах отсчитываются от него')
+    parser.add_argument('--engine', choices=('openpyxl', 'xml'), default='openpyxl',
+                        help='чтение листов: openpyxl или напрямую из XML листа')
+    parser.add_argument('--preload', nargs='*', default=[], metavar='XLSX',
+                        help='книги (в каталоге данных), все листы которых читаются сразу при запуске')
+    args = parser.parse_args(argv)
+
+    workbook.cache.set_engine(args.engine)
+    DocumentRequestHandler.data_dir = args.data_dir
+    for filename in args.preload:
+        workbook.cache.read_all_with_merged_cells(os.path.realpath(os.path.join(args.data_dir, filename)))
+
+    if args.socket is not None:
+        server = UnixHTTPServer(args.socket, DocumentRequestHandler)
+        print(f'Сервис слушает {args.socket}')
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), DocumentRequestHandler)
+        print(f'Сервис слушает http://{args.host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+
+from styles import BODY_STYLE
+
+
+# Описание документа: главы, абзацы, таблицы из листов Excel и разбиение таблиц на части.
+# Документ по описанию строит render.render_document
+
+# Абзацы текста. Строки - шаблоны str.format: {flow_rate} - параметр документа,
+# {table5_5} - номер таблицы по её id, например 2.5 (номера назначаются до построения документа)
+@dataclass
+class Paragraphs:
+    lines: list
+    style: str = BODY_STYLE
+
+
+# Таблица из листа Excel: первая часть с заголовком «Таблица ...», остальные - «Продолжение таблицы ...».
+# Разбиение на части (pagination):
+#   'rows' - по rows_per_page_first / rows_per_page_next строк;
+#   'auto' - по оценке высоты строк (длина текста, ширина колонки, кегль): часть заполняет остаток текущей
+#            страницы или целую страницу, строки вертикально объединённых ячеек не разрываются;
+#   'repeat_header' - одна таблица без частей, первые header_rows строк Word повторяет на каждой странице
+@dataclass
+class SheetTable:
+    id: str  # имя номера таблицы в шаблонах текста, например 'table5_1'
+    sheet: str
+    title: str
+    rows_per_page_first: int = 100  # Количество строк для первой таблицы
+    rows_per_page_next: int = 100  # Количество строк для следующих таблиц
+    include_header: bool = True  # Строка заголовков колонок в первой части
+    include_header_next: bool = None  # То же для остальных частей (None - как в первой)
+    filename: str = None  # Книга Excel (None - исходная книга документа)
+    pagination: str = 'rows'
+    header_rows: int = None  # Повторяемые строки для 'repeat_header' (None - строка заголовков колонок, если есть)
+    font_metrics: bool = False  # Ширины колонок по ширине текста Times New Roman 12 пт, а не по числу символов
+
+
+# Номер таблицы без самой таблицы (номер занят, таблица пока не выводится)
+@dataclass
+class ReservedTable:
+    id: str
+
+
+# Новый раздел с новой страницы
+@dataclass
+class NewSection:
+    landscape: bool = False
+
+
+# Участок документа, который строится кодом: func(doc, context)
+@dataclass
+class Custom:
+    func: callable
+
+
+# Статический участок документа (например, титульный лист): func(doc) строится один раз (templates.py),
+# дальше его XML копируется в документ. Поля {name} в тексте заполняются из параметров документа
+# и из fields(context) -> dict (например, текущая дата)
+@dataclass
+class Template:
+    func: callable
+    fields: callable = None
+
+
+# Глава: заголовок с номером (title=None - без заголовка и номера, например титульный лист).
+# new_section - глава начинается с нового раздела книжной ориентации
+@dataclass
+class Chapter:
+    title: str
+    blocks: list = field(default_factory=list)
+    new_section: bool = True
+
+
+@dataclass
+class DocumentSpec:
+    chapters: list
+    table_width_cm: float = 25.5  # Общая ширина таблиц
+    parameters: callable = None  # Параметры документа для шаблонов текста: parameters(database_file) -> dict
+    parameters_sheet: str = '1'  # Лист исходной книги, из которого читаются параметры
+    compact_spacing: bool = False  # Пустые абзацы-отступы заменяются интервалами до/после соседних абзацев
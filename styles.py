@@ -0,0 +1,52 @@
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.ns import qn
+from docx.shared import Pt, Cm
+
+FONT_NAME = 'Times New Roman'
+
+# Именованные стили документа: оформление задаётся один раз в styles.xml,
+# абзацы и прогоны только ссылаются на стиль
+BODY_STYLE = 'Body 14pt TNR'  # Основной текст
+BODY_CHAR_STYLE = 'Body 14pt TNR Char'  # Шрифт основного текста без оформления абзаца (заголовки таблиц)
+TABLE_12PT_STYLE = 'Table 12pt'  # Текст ячеек таблиц
+TABLE_8PT_STYLE = 'Table 8pt'  # Текст ячеек таблиц потоков
+
+# Стиль абзаца -> (размер шрифта, отступ первой строки в см, междустрочный интервал в пт)
+PARAGRAPH_STYLES = {
+    BODY_STYLE: (14, 1.25, 22),
+    TABLE_12PT_STYLE: (12, 0.0, 18),
+    TABLE_8PT_STYLE: (8, 0.0, 11.5),
+}
+
+
+def _set_style_font(style, font_size):
+    style.font.name = FONT_NAME
+    style.font.size = Pt(font_size)
+    # Это нужно для корректного отображения шрифта на всех платформах
+    style.element.rPr.rFonts.set(qn('w:eastAsia'), FONT_NAME)
+
+
+# Добавление стилей в документ (повторный вызов ничего не меняет)
+def add_styles(doc):
+    styles = doc.styles
+
+    for name, (font_size, first_line_indent, line_spacing) in PARAGRAPH_STYLES.items():
+        if name in styles:
+            continue
+        style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = styles['Normal']
+        _set_style_font(style, font_size)
+
+        paragraph_format = style.paragraph_format
+        paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+        paragraph_format.left_indent = Cm(0)
+        paragraph_format.right_indent = Cm(0)
+        paragraph_format.first_line_indent = Cm(first_line_indent)
+        paragraph_format.line_spacing = Pt(line_spacing)
+        paragraph_format.space_after = Cm(0)
+        paragraph_format.space_before = Cm(0)
+
+    if BODY_CHAR_STYLE not in styles:
+        style = styles.add_style(BODY_CHAR_STYLE, WD_STYLE_TYPE.CHARACTER)
+        _set_style_font(style, 14)
@@ -0,0 +1,246 @@
+import copy
+import weakref
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.oxml.table import CT_Tc
+from docx.shared import Emu
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+
+from column_table import column_text
+
+
+# Пустое значение ячейки: None, NaN или строка из одних пробелов
+def is_empty(value):
+    return value is None or value != value or str(value).strip() == ''
+
+
+# Ширины глифов Times New Roman в тысячных долях кегля (для остальных символов - _TNR_DEFAULT_WIDTH)
+_TNR_GLYPH_WIDTHS = {
+    ' ': 250, '!': 333, '"': 408, '#': 500, '$': 500, '%': 833, '&': 778, "'": 180, '(': 333, ')': 333,
+    '*': 500, '+': 564, ',': 250, '-': 333, '.': 250, '/': 278, ':': 278, ';': 278, '<': 564, '=': 564,
+    '>': 564, '?': 444, '@': 921, '[': 333, '\\': 278, ']': 333, '^': 469, '_': 500, '`': 333, '{': 480,
+    '|': 200, '}': 480, '~': 541, '°': 400, '±': 564, '×': 564, '«': 500, '»': 500, '–': 500, '—': 1000,
+    '№': 1009, 'µ': 500, '³': 300, '²': 300,
+    'A': 722, 'B': 667, 'C': 667, 'D': 722, 'E': 611, 'F': 556, 'G': 722, 'H': 722, 'I': 333, 'J': 389,
+    'K': 722, 'L': 611, 'M': 889, 'N': 722, 'O': 722, 'P': 556, 'Q': 722, 'R': 667, 'S': 556, 'T': 611,
+    'U': 722, 'V': 722, 'W': 944, 'X': 722, 'Y': 722, 'Z': 611,
+    'a': 444, 'b': 500, 'c': 444, 'd': 500, 'e': 444, 'f': 333, 'g': 500, 'h': 500, 'i': 278, 'j': 278,
+    'k': 500, 'l': 278, 'm': 778, 'n': 500, 'o': 500, 'p': 500, 'q': 500, 'r': 333, 's': 389, 't': 278,
+    'u': 500, 'v': 500, 'w': 722, 'x': 500, 'y': 500, 'z': 444,
+    'А': 722, 'Б': 574, 'В': 667, 'Г': 578, 'Д': 682, 'Е': 611, 'Ё': 611, 'Ж': 896, 'З': 501, 'И': 722,
+    'Й': 722, 'К': 667, 'Л': 678, 'М': 889, 'Н': 722, 'О': 722, 'П': 722, 'Р': 556, 'С': 667, 'Т': 611,
+    'У': 637, 'Ф': 760, 'Х': 722, 'Ц': 727, 'Ч': 671, 'Ш': 1000, 'Щ': 1000, 'Ъ': 734, 'Ы': 884, 'Ь': 574,
+    'Э': 664, 'Ю': 1044, 'Я': 667,
+    'а': 444, 'б': 509, 'в': 472, 'г': 410, 'д': 509, 'е': 444, 'ё': 444, 'ж': 691, 'з': 395, 'и': 535,
+    'й': 535, 'к': 486, 'л': 499, 'м': 633, 'н': 535, 'о': 500, 'п': 535, 'р': 500, 'с': 444, 'т': 437,
+    'у': 500, 'ф': 648, 'х': 500, 'ц': 535, 'ч': 503, 'ш': 770, 'щ': 770, 'ъ': 517, 'ы': 672, 'ь': 456,
+    'э': 429, 'ю': 747, 'я': 460,
+}
+_TNR_DEFAULT_WIDTH = 500  # Цифры и прочие символы
+
+# Кэш ширин колонок: id(ColumnTable) -> (слабая ссылка на таблицу, {размер шрифта: ширины}).
+# Таблица листа из WorkbookCache живёт всю сессию, поэтому ширины каждого листа считаются один раз
+# для каждой модели ширины (число символов - font_size None, ширина текста - кегль)
+_text_widths_cache = {}
+# Кэш строк таблицы для row_values: id(ColumnTable) -> (слабая ссылка на таблицу, строки)
+_row_values_cache = {}
+
+
+# Ширина самой длинной строки текста в пунктах при наборе Times New Roman кеглем font_size
+def text_width_pt(text, font_size):
+    return max(sum(_TNR_GLYPH_WIDTHS.get(char, _TNR_DEFAULT_WIDTH) for char in line)
+               for line in text.split('\n')) * font_size / 1000
+
+
+# Ширина содержимого каждой колонки таблицы листа по всем строкам (пустые значения не учитываются):
+# без font_size - максимальное число символов, с font_size - максимальная ширина текста в пунктах
+def text_widths(table, font_size=None):
+    cached = _text_widths_cache.get(id(table))
+    if cached is not None and cached[0]() is table and font_size in cached[1]:
+        return cached[1][font_size]
+
+    widths = []
+    for values in table.data:
+        text = {value for value in (text.strip() for text in column_text(values)) if value}
+        if not text:
+            widths.append(0)
+        elif font_size is None:
+            widths.append(max(map(len, text)))
+        else:
+            widths.append(max(text_width_pt(value, font_size) for value in text))
+
+    store_text_widths(table, font_size, widths)
+    return widths
+
+
+# Запоминание ширин колонок таблицы, посчитанных заранее (например, в другом процессе)
+def store_text_widths(table, font_size, widths):
+    cached = _text_widths_cache.get(id(table))
+    if cached is None or cached[0]() is not table:
+        cached = (weakref.ref(table, lambda ref, key=id(table): _text_widths_cache.pop(key, None)), {})
+        _text_widths_cache[id(table)] = cached
+    cached[1][font_size] = widths
+
+
+# Поля ячейки таблицы Word слева и справа (по 0,19 см) и добавка к высоте строки на границы, в пунктах
+_CELL_MARGINS_PT = 2 * 5.4
+_ROW_BORDERS_PT = 1.0
+
+
+# Число строк текста после переноса по словам на ширине width_pt. Слово шире строки не разрывается:
+# Word в таблице с автоподбором расширяет для него колонку, поэтому оно занимает одну строку
+def text_lines(text, width_pt, font_size):
+    space = _TNR_GLYPH_WIDTHS[' '] * font_size / 1000
+    lines = 0
+    for line in text.split('\n'):
+        lines += 1
+        used = None
+        for word in line.split():
+            width = text_width_pt(word, font_size)
+            if used is not None and used + space + width > width_pt:
+                lines += 1
+                used = None
+            used = width if used is None else used + space + width
+    return lines
+
+
+# Оценка высоты строки таблицы в пунктах: самая высокая ячейка (текст переносится по ширине колонки
+# за вычетом полей ячейки), умноженная на междустрочный интервал. widths - ширины колонок в EMU
+def estimate_row_height(values, widths, font_size, line_spacing):
+    lines = max((text_lines(str(value), Emu(width).pt - _CELL_MARGINS_PT, font_size)
+                 for value, width in zip(values, widths)), default=1)
+    return lines * line_spacing + _ROW_BORDERS_PT
+
+
+# Значения таблицы листа построчно: список строк, каждая - список значений колонок. Строки собираются
+# один раз (кэш по таблице, как у text_widths), части таблицы берут срезы списка
+def row_values(table):
+    cached = _row_values_cache.get(id(table))
+    if cached is not None and cached[0]() is table:
+        return cached[1]
+
+    rows = table.rows()
+    store_row_values(table, rows)
+    return rows
+
+
+# Запоминание строк таблицы, собранных заранее (например, в другом процессе)
+def store_row_values(table, rows):
+    _row_values_cache[id(table)] = (weakref.ref(table, lambda ref, key=id(table): _row_values_cache.pop(key, None)),
+                                    rows)
+
+
+# Ширины колонок таблицы общей шириной total_width пропорционально ширине содержимого
+# (у листа без колонок - пустой список)
+def proportional_widths(widths, total_width):
+    if not widths:
+        return []
+    total = sum(widths)
+    if total == 0:
+        return [Emu(int(total_width / len(widths)))] * len(widths)
+    return [Emu(int(total_width * width / total)) for width in widths]
+
+
+# Шаблон ячейки w:tc: ширина и (если задано) оформленный абзац с одним пустым прогоном.
+# format_paragraph вызывается один раз на шаблон, а не для каждой ячейки таблицы
+def _cell_template(table, width, format_paragraph=None):
+    tc = CT_Tc.new()
+    if width is not None:
+        tc.width = width
+    if format_paragraph is not None:
+        paragraph = Paragraph(tc.p_lst[0], table)
+        paragraph.text = ' '
+        format_paragraph(paragraph)
+        paragraph.runs[0].text = ''
+    return tc
+
+
+def _append_row(tbl, values, filled_templates, empty_templates, skip_empty):
+    tr = OxmlElement('w:tr')
+    for value, filled_tc, empty_tc in zip(values, filled_templates, empty_templates):
+        if skip_empty and is_empty(value):
+            tr.append(copy.deepcopy(empty_tc))
+            continue
+        tc = copy.deepcopy(filled_tc)
+        # Последний элемент ячейки - абзац, последний элемент абзаца - прогон шаблона
+        tc[-1][-1].text = str(value)
+        tr.append(tc)
+    tbl.append(tr)
+
+
+# Быстрое построение таблицы: строки w:tr собираются копированием шаблонов ячеек,
+# без установки свойств шрифта и абзаца для каждой ячейки через python-docx.
+# col_widths - ширины колонок (None - ширина колонки сетки, как у table.add_row),
+# header - подписи колонок или None, skip_empty - оставлять пустые значения без прогона
+def add_fast_table(doc, rows, num_columns, format_paragraph, col_widths=None, header=None, skip_empty=False):
+    table = doc.add_table(rows=0, cols=num_columns)
+    table.style = 'Table Grid'
+    tbl = table._tbl
+
+    if col_widths is None:
+        col_widths = [None] * num_columns
+    col_widths = [gridCol.w if width is None else width
+                  for width, gridCol in zip(col_widths, tbl.tblGrid.gridCol_lst)]
+
+    filled_templates = [_cell_template(table, width, format_paragraph) for width in col_widths]
+    empty_templates = [_cell_template(table, width) for width in col_widths] if skip_empty else filled_templates
+
+    if header is not None:
+        _append_row(tbl, header, filled_templates, filled_templates, False)
+    for values in rows:
+        _append_row(tbl, values, filled_templates, empty_templates, skip_empty)
+
+    return table
+
+
+# Первые count строк таблицы - строки заголовка (w:tblHeader): Word повторяет их на каждой странице
+def set_header_rows(table, count):
+    for tr in table._tbl.tr_lst[:count]:
+        tr.get_or_add_trPr().append(OxmlElement('w:tblHeader'))
+
+
+# Блочные элементы содержимого ячейки w:tc
+_BLOCK_TAGS = (qn('w:p'), qn('w:tbl'), qn('w:sdt'))
+
+
+# Содержимое ячейки tc переносится в верхнюю левую ячейку объединения top_tc так же, как в _Cell.merge:
+# у top_tc снимается завершающий пустой абзац, в tc остаётся один пустой абзац. Ячейка из одного абзаца
+# без прогонов не переносится
+def _move_content(tc, top_tc):
+    if tc is top_tc:
+        return
+    blocks = [child for child in tc if child.tag in _BLOCK_TAGS]
+    if len(blocks) == 1 and blocks[0].tag == qn('w:p') and not blocks[0].r_lst:
+        return
+    top_blocks = [child for child in top_tc if child.tag in _BLOCK_TAGS]
+    if top_blocks[-1].tag == qn('w:p') and not top_blocks[-1].r_lst:
+        top_tc.remove(top_blocks[-1])
+    for block in blocks:
+        top_tc.append(block)
+    tc.append(OxmlElement('w:p'))
+
+
+# Объединение ячеек таблицы по диапазонам (top, left, bottom, right) с нуля; row_shift сдвигает строки.
+# Ячейки берутся из сетки строк w:tr, собранной один раз, и объединяются напрямую: первая ячейка строки
+# диапазона получает w:gridSpan и ширину поглощённых ячеек (они удаляются), строки диапазона - w:vMerge.
+# Результат тот же, что у _Cell.merge, но без поиска строки и колонки ячейки по всей таблице на каждое
+# объединение. Возвращает верхние левые ячейки объединений
+def merge_cells(table, spans, row_shift=0):
+    grid = [tr.tc_lst for tr in table._tbl.tr_lst]
+    merged_cells = []
+    for top, left, bottom, right in spans:
+        top_tc = grid[top + row_shift][left]
+        for row in range(top + row_shift, bottom + row_shift + 1):
+            tc = grid[row][left]
+            _move_content(tc, top_tc)
+            for next_tc in grid[row][left + 1:right + 1]:
+                _move_content(next_tc, top_tc)
+                if tc.width and next_tc.width:
+                    tc.width = Emu(tc.width + next_tc.width)
+                tc.grid_span += next_tc.grid_span
+                next_tc.getparent().remove(next_tc)
+            tc.vMerge = None if top == bottom else 'restart' if tc is top_tc else 'continue'
+        merged_cells.append(_Cell(top_tc, table))
+    return merged_cells
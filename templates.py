@@ -0,0 +1,104 @@
+import copy
+import inspect
+import re
+from bisect import bisect_right
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.oxml.parser import parse_xml
+from lxml import etree
+
+from styles import add_styles
+
+# Шаблоны, скомпилированные в текущем процессе: (func, XML свойств раздела) -> DocumentTemplate
+_templates = {}
+_FIELD = re.compile(r'\{(\w+)\}')
+
+
+# Статический участок документа (титульный лист, типовой текст), построенный один раз и сохранённый как XML.
+# В каждый документ вставляется копия элементов, в тексте которой заполняются только поля вида {name}
+class DocumentTemplate:
+    def __init__(self, xml):
+        self.xml = xml
+        self._body = parse_xml(xml)
+
+    # Копия элементов шаблона с подставленными полями fields
+    def clone(self, fields):
+        body = copy.deepcopy(self._body)
+        for p in body.iter(qn('w:p')):
+            _fill_fields(list(p.iter(qn('w:t'))), fields)
+        return list(body)
+
+
+# Подстановка полей {name} из fields в текст абзаца (элементы w:t его прогонов). Заменяются только известные
+# поля, остальные фигурные скобки остаются как есть. Поле, разбитое Word на несколько прогонов, заполняется
+# целиком: значение попадает в прогон, где поле начинается, остаток поля убирается из следующих прогонов
+def _fill_fields(ts, fields):
+    texts = [t.text or '' for t in ts]
+    joined = ''.join(texts)
+    matches = [match for match in _FIELD.finditer(joined) if match.group(1) in fields]
+    if not matches:
+        return
+
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    # С конца абзаца: замена не сдвигает начало полей, стоящих раньше
+    for match in reversed(matches):
+        first = bisect_right(starts, match.start()) - 1
+        last = bisect_right(starts, match.end() - 1) - 1
+        value = str(fields[match.group(1)])
+        head = texts[first][:match.start() - starts[first]]
+        tail = texts[last][match.end() - starts[last]:]
+        if first == last:
+            texts[first] = head + value + tail
+        else:
+            texts[first] = head + value
+            for index in range(first + 1, last):
+                texts[index] = ''
+            texts[last] = tail
+
+    for t, text in zip(ts, texts):
+        if t.text != text:
+            t.text = text
+            if text != text.strip():
+                t.set(qn('xml:space'), 'preserve')
+
+
+# Построение участка func(doc) в пустом документе с теми же стилями и свойствами раздела sectPr
+# (от ширины страницы зависят ширины колонок таблиц). Результат - XML элементов участка
+def _build_template(func, sectPr):
+    doc = Document()
+    add_styles(doc)
+    body = doc.element.body
+    body.replace(body.sectPr, copy.deepcopy(sectPr))
+    func(doc)
+
+    fragment = OxmlElement('w:body')
+    for element in body[:len(body) - 1]:
+        fragment.append(element)
+    return etree.tostring(fragment, encoding='UTF-8')
+
+
+# Шаблон участка func для раздела sectPr: строится один раз за процесс, с кэшем сборки (build_cache.BuildCache)
+# XML шаблона берётся с диска, пока не изменились код func и свойства раздела
+def compile_template(func, sectPr, build_cache=None):
+    sectPr_xml = etree.tostring(sectPr)
+    if (func, sectPr_xml) in _templates:
+        return _templates[(func, sectPr_xml)]
+
+    xml = None
+    if build_cache is not None:
+        key = build_cache.key('template', inspect.getsource(func), sectPr_xml)
+        xml = build_cache.load_value(key)
+    if xml is None:
+        xml = _build_template(func, sectPr)
+        if build_cache is not None:
+            build_cache.store_value(key, xml)
+
+    _templates[(func, sectPr_xml)] = DocumentTemplate(xml)
+    return _templates[(func, sectPr_xml)]
@@ -0,0 +1,295 @@
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from bisect import bisect_left
+
+import profiling
+from column_table import ColumnTable
+
+# openpyxl импортируется при первом чтении книги, а не при импорте модуля: его загрузка занимает
+# большую часть запуска, а структура книги (sheet_paths) и cli.py --help / --dry-run без него обходятся.
+# Листы читаются потоком в ColumnTable (column_table.py), без pandas и без полной загрузки книги
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_MERGE_CELL = re.compile(rb'<(?:[\w.-]+:)?mergeCell\s[^>]*?\bref=["\']([^"\']+)["\']')
+_CELL_REFERENCE = re.compile(r'\$?([A-Z]+)\$?(\d+)')
+
+
+# Сессия чтения исходных книг Excel: каждый файл разбирается один раз,
+# все листы выдаются из уже загруженной книги
+# engine - чем читаются значения листов: 'openpyxl' или 'xml' (xlsx.XlsxReader, XML листа разбирается
+# напрямую, без объектов openpyxl; значения те же)
+class WorkbookCache:
+    def __init__(self, engine='openpyxl'):
+        self.set_engine(engine)
+        self._read_only_workbooks = {}
+        self._dimension_widths = {}
+        self._xlsx_readers = {}
+        self._sheet_paths = {}
+        self._sheets = {}
+        self._file_stamps = {}
+
+    # Выбор способа чтения; уже прочитанные листы остаются в кэше (значения одинаковы при обоих способах)
+    def set_engine(self, engine):
+        if engine not in ('openpyxl', 'xml'):
+            raise ValueError(f'Неизвестный способ чтения книг: {engine}')
+        self.engine = engine
+
+    # Время изменения и размер файла на момент первого обращения к нему (см. refresh)
+    def _track(self, filename):
+        if filename not in self._file_stamps:
+            stat = os.stat(filename)
+            self._file_stamps[filename] = (stat.st_mtime_ns, stat.st_size)
+
+    # Книга openpyxl в режиме только для чтения: листы не загружаются в память, строки читаются потоком
+    def read_only_workbook(self, filename):
+        self._track(filename)
+        if filename not in self._read_only_workbooks:
+            from openpyxl import load_workbook
+            with profiling.span('load_workbook'):
+                self._read_only_workbooks[filename] = load_workbook(filename, read_only=True, data_only=True)
+        return self._read_only_workbooks[filename]
+
+    # Книга для чтения XML листов напрямую (общие строки и форматы дат читаются при первом обращении)
+    def xlsx_reader(self, filename):
+        self._track(filename)
+        if filename not in self._xlsx_readers:
+            from xlsx import XlsxReader
+            with profiling.span('load_workbook'):
+                self._xlsx_readers[filename] = XlsxReader(filename)
+        return self._xlsx_readers[filename]
+
+    # Строки листа кортежами значений, потоком. Элементу dimension листа нельзя доверять: некоторые программы
+    # пишут <dimension ref="A1"/> и добавляют ячейки дальше, а openpyxl в режиме только для чтения обрезает
+    # по нему строки. Поэтому размеры листа сбрасываются и читаются все строки, а ширина из dimension
+    # используется только как наименьшая ширина строки (так же читает xlsx.XlsxReader)
+    def iter_rows(self, filename, sheet_name):
+        if self.engine == 'xml':
+            return self.xlsx_reader(filename).iter_rows(sheet_name)
+        worksheet = self.read_only_workbook(filename)[sheet_name]
+        key = (filename, sheet_name)
+        if key not in self._dimension_widths:
+            self._dimension_widths[key] = worksheet.max_column or 0
+            worksheet.reset_dimensions()
+        return _pad_rows(worksheet.iter_rows(values_only=True), self._dimension_widths[key])
+
+    # Объединённые диапазоны листа (в режиме только для чтения openpyxl их не читает)
+    def merged_ranges(self, filename, sheet_name):
+        self._track(filename)
+        with zipfile.ZipFile(filename) as archive:
+            if filename not in self._sheet_paths:
+                self._sheet_paths[filename] = sheet_paths(archive)
+            return MergedRanges(read_merged_ranges(archive, self._sheet_paths[filename][sheet_name]))
+
+    # Лист в виде ColumnTable и список объединённых диапазонов
+    def read_excel_with_merged_cells(self, filename, sheet_name):
+        key = (filename, sheet_name)
+        if key not in self._sheets:
+            with profiling.span('read_excel_with_merged_cells'):
+                self._sheets[key] = _read_sheet_with_merged_cells(self.iter_rows(filename, sheet_name),
+                                                                  self.merged_ranges(filename, sheet_name))
+        return self._sheets[key]
+
+    # Лист уже прочитан (или подготовлен заранее через add_sheet)
+    def has_sheet(self, filename, sheet_name):
+        return (filename, sheet_name) in self._sheets
+
+    # Лист, прочитанный вне кэша (например, в другом процессе): дальше выдаётся read_excel_with_merged_cells
+    def add_sheet(self, filename, sheet_name, table, merged_ranges):
+        self._track(filename)
+        self._sheets[(filename, sheet_name)] = table, merged_ranges
+
+    # Имена всех листов книги в порядке их следования
+    def sheet_names(self, filename):
+        if self.engine == 'xml':
+            return self.xlsx_reader(filename).sheet_names
+        return self.read_only_workbook(filename).sheetnames
+
+    # Все листы книги (имя листа -> (table, merged_ranges)) из одной загрузки файла
+    def read_all_with_merged_cells(self, filename):
+        return {sheet_name: self.read_excel_with_merged_cells(filename, sheet_name)
+                for sheet_name in self.sheet_names(filename)}
+
+    # Чтение набора листов [(filename, sheet_name), ...] заранее, книги по порядку: key -> (table, merged_ranges)
+    def read_sheets(self, keys):
+        return {key: self.read_excel_with_merged_cells(*key)
+                for key in sorted(keys, key=lambda key: key[0])}
+
+    # Сброс кэша (например, после изменения исходных файлов)
+    def clear(self):
+        for read_only_workbook in self._read_only_workbooks.values():
+            read_only_workbook.close()
+        self._read_only_workbooks.clear()
+        self._dimension_widths.clear()
+        self._xlsx_readers.clear()
+        self._sheet_paths.clear()
+        self._sheets.clear()
+        self._file_stamps.clear()
+
+    # Сброс всего, что прочитано из файла filename
+    def forget(self, filename):
+        if filename in self._read_only_workbooks:
+            self._read_only_workbooks.pop(filename).close()
+        for key in [key for key in self._dimension_widths if key[0] == filename]:
+            del self._dimension_widths[key]
+        self._xlsx_readers.pop(filename, None)
+        self._sheet_paths.pop(filename, None)
+        self._file_stamps.pop(filename, None)
+        for key in [key for key in self._sheets if key[0] == filename]:
+            del self._sheets[key]
+
+    # Сброс книг, изменённых (или удалённых) с момента чтения: время изменения или размер файла
+    # отличаются от запомненных. Для долгоживущего процесса (service.py) перед каждой сборкой.
+    # Возвращает список сброшенных файлов
+    def refresh(self):
+        changed = []
+        for filename, stamp in list(self._file_stamps.items()):
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                stat = None
+            if stat is None or (stat.st_mtime_ns, stat.st_size) != stamp:
+                self.forget(filename)
+                changed.append(filename)
+        return changed
+
+
+# Номер колонки (с единицы) по её буквам: 'A' -> 1, 'AA' -> 27
+def column_number(letters):
+    number = 0
+    for char in letters:
+        number = number * 26 + ord(char) - 64
+    return number
+
+
+# Границы диапазона ячеек 'A1:C3' (или одной ячейки) в порядке CellRange.bounds openpyxl:
+# (min_col, min_row, max_col, max_row), с единицы
+def range_bounds(ref):
+    (first_letters, first_row), *last = _CELL_REFERENCE.findall(ref)
+    last_letters, last_row = last[-1] if last else (first_letters, first_row)
+    return column_number(first_letters), int(first_row), column_number(last_letters), int(last_row)
+
+
+# Объединённые диапазоны листа: список границ (min_col, min_row, max_col, max_row) с индексом
+# по первой строке диапазона для быстрой выборки диапазонов части таблицы
+class MergedRanges(list):
+    def __init__(self, ranges=()):
+        super().__init__(ranges)
+        # (min_row, min_col, max_row, max_col), упорядочено по первой строке
+        self._bounds = sorted((min_row, min_col, max_row, max_col) for min_col, min_row, max_col, max_row in self)
+        self._min_rows = [bounds[0] for bounds in self._bounds]
+        self._max_height = max((max_row - min_row for min_row, _, max_row, _ in self._bounds), default=0)
+
+    # Диапазоны, пересекающие строки таблицы [start_row, end_row), где строка таблицы = строка Excel - row_offset.
+    # Возвращает (top, left, bottom, right) с нуля, строки отсчитываются от start_row. Диапазон, попавший
+    # на границу частей таблицы, обрезается по ней и объединяется в каждой части отдельно
+    def spans(self, start_row, end_row, row_offset=1):
+        first_row = start_row + row_offset
+        last_row = end_row + row_offset - 1
+        # Диапазон, пересекающий first_row, начинается не раньше first_row - _max_height
+        lo = bisect_left(self._min_rows, first_row - self._max_height)
+        hi = bisect_left(self._min_rows, last_row + 1)
+        spans = []
+        for min_row, min_col, max_row, max_col in self._bounds[lo:hi]:
+            if max_row < first_row:
+                continue
+            top = max(min_row, first_row) - first_row
+            bottom = min(max_row, last_row) - first_row
+            if top != bottom or min_col != max_col:
+                spans.append((top, min_col - 1, bottom, max_col - 1))
+        return spans
+
+
+# Имя листа -> путь к XML листа внутри архива книги
+def sheet_paths(archive):
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{_PACKAGE_REL_NS}Relationship')}
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    paths = {}
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        target = targets[sheet.get(f'{_REL_NS}id')]
+        paths[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+    return paths
+
+
+# Объединённые диапазоны из элементов mergeCell XML листа. XML читается кусками и не разбирается:
+# элементы mergeCell ищутся в байтах, поэтому строки листа не разбираются второй раз.
+# Диапазоны - границы range_bounds, объекты openpyxl не создаются
+def read_merged_ranges(archive, path, chunk_size=1 << 20):
+    ranges = []
+    tail = b''
+    with archive.open(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = tail + chunk
+            # Последний тег куска может быть неполным - он переносится в следующий кусок
+            end = data.rfind(b'<') if chunk else len(data)
+            if end == -1:
+                end = len(data)
+            ranges += [range_bounds(match.group(1).decode('ascii')) for match in _MERGE_CELL.finditer(data, 0, end)]
+            tail = data[end:]
+            if not chunk:
+                return ranges
+
+
+# Строки, дополненные пустыми значениями до ширины width; более длинные строки не обрезаются
+def _pad_rows(rows, width):
+    for row in rows:
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        yield row
+
+
+# Лист в ColumnTable: строки листа (кортежи значений) читаются потоком и сразу раскладываются по колонкам,
+# без промежуточного списка строк. Первая строка - заголовки колонок
+def _read_sheet_with_merged_cells(rows, merged_ranges):
+    # Ячейки объединённых диапазонов, кроме первой, остаются пустыми: строка -> колонки
+    blank_cells = {}
+    for min_col, min_row, max_col, max_row in merged_ranges:
+        for row in range(min_row - 1, max_row):
+            for col in range(min_col - 1, max_col):
+                if row != min_row - 1 or col != min_col - 1:
+                    blank_cells.setdefault(row, set()).add(col)
+
+    header = None
+    columns = []
+    n_rows = 0
+    for row_number, values in enumerate(rows):
+        blank = blank_cells.get(row_number)
+        if blank is not None:
+            values = ['' if col in blank else value for col, value in enumerate(values)]
+
+        if header is None:
+            header = list(values)
+            columns = [[] for _ in header]
+            continue
+
+        # Строка длиннее предыдущих: новые колонки дополняются пустыми значениями
+        for _ in range(len(columns), len(values)):
+            header.append(None)
+            columns.append([None] * n_rows)
+        for column, value in zip(columns, values):
+            column.append(value)
+        for column in columns[len(values):]:
+            column.append(None)
+        n_rows += 1
+
+    if header is None:
+        return ColumnTable(), merged_ranges
+    return ColumnTable.from_columns(header, columns, n_rows), merged_ranges
+
+
+# Общая сессия процесса, используется скриптами bd.py, test.py, flows.py и dev_ol.py
+cache = WorkbookCache()
+
+
+def read_excel_with_merged_cells(filename, sheet_name):
+    return cache.read_excel_with_merged_cells(filename, sheet_name)
+
+
+def read_all_with_merged_cells(filename):
+    return cache.read_all_with_merged_cells(filename)
@@ -0,0 +1,242 @@
+import datetime
+import re
+import zipfile
+
+from lxml import etree
+
+from workbook import column_number, sheet_paths
+
+# Быстрое чтение значений листов xlsx напрямую из XML, без openpyxl: разбираются только общие строки,
+# форматы чисел (чтобы даты читались датами) и XML листа. Ячейки не превращаются в объекты Cell со стилями.
+# Значения совпадают со значениями openpyxl в режиме data_only. openpyxl не импортируется: уже импорт
+# openpyxl.utils загружает весь пакет, поэтому даты и форматы чисел разбираются здесь, так же как в openpyxl
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_ROW = f'{_MAIN_NS}row'
+_CELL = f'{_MAIN_NS}c'
+_VALUE = f'{_MAIN_NS}v'
+_INLINE_STRING = f'{_MAIN_NS}is'
+_TEXT = f'{_MAIN_NS}t'
+_RUN = f'{_MAIN_NS}r'
+_DIMENSION = f'{_MAIN_NS}dimension'
+
+_COORDINATE = re.compile(r'([A-Z]+)(\d+)')
+_DIGITS = '0123456789'
+
+# Встроенные форматы чисел (numFmtId без элемента numFmt), которые являются форматами даты или времени
+_BUILTIN_DATE_FORMATS = {14: 'mm-dd-yy', 15: 'd-mmm-yy', 16: 'd-mmm', 17: 'mmm-yy', 18: 'h:mm AM/PM',
+                         19: 'h:mm:ss AM/PM', 20: 'h:mm', 21: 'h:mm:ss', 22: 'm/d/yy h:mm', 45: 'mm:ss',
+                         46: '[h]:mm:ss', 47: 'mmss.0'}
+# Текст в кавычках и квадратных скобках (кроме [h], [m], [s]) не влияет на то, дата ли это
+_FORMAT_LITERALS = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_FORMAT_DATE_PART = re.compile(r'(?<![_\\])[dmhysDMHYS]')
+_FORMAT_TIMEDELTA = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.I)
+
+_WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+_MAC_EPOCH = datetime.datetime(1904, 1, 1)
+_ISO_DATETIME = re.compile(r'''
+(?P<date>(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2}))?T?
+(?P<time>(?P<hour>\d{2}):(?P<minute>\d{2})(:(?P<second>\d{2})(?P<microsecond>\.\d{1,3})?)?)?Z?''', re.VERBOSE)
+_ISO_DURATION = re.compile(r'PT((?P<hours>\d+)H)?((?P<minutes>\d+)M)?((?P<seconds>\d+(\.\d{1,3})?)S)?')
+
+
+# Формат числа - формат даты или времени (смотрится только первая секция формата, до ';')
+def _is_date_format(code):
+    return _FORMAT_DATE_PART.search(_FORMAT_LITERALS.sub('', code.split(';')[0])) is not None
+
+
+def _is_timedelta_format(code):
+    return _FORMAT_TIMEDELTA.search(code.split(';')[0]) is not None
+
+
+# Дата по числу дней от начала эпохи книги, как openpyxl.utils.datetime.from_excel: время без даты
+# для значений меньше суток, поправка на несуществующее 29.02.1900 в эпохе 1900
+def _from_excel(value, epoch, timedelta=False):
+    if timedelta:
+        td = datetime.timedelta(days=value)
+        if td.microseconds:
+            td = datetime.timedelta(seconds=td.total_seconds() // 1, microseconds=round(td.microseconds, -3))
+        return td
+
+    day, fraction = divmod(value, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        minutes, seconds = divmod(diff.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return datetime.time(hours, minutes, seconds, diff.microseconds)
+    if 0 < value < 60 and epoch == _WINDOWS_EPOCH:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + diff
+
+
+# Значение ячейки типа 'd' (дата, время, дата и время или длительность ISO 8601), как from_ISO8601 openpyxl
+def _from_iso8601(value):
+    match = _ISO_DATETIME.match(value)
+    if match and any(match.groups()):
+        parts = match.groupdict(0)
+        for key in ('year', 'month', 'day', 'hour', 'minute', 'second'):
+            if parts[key]:
+                parts[key] = int(parts[key])
+        if parts['microsecond']:
+            parts['microsecond'] = int(float(parts['microsecond']) * 1_000_000)
+
+        if not parts['date']:
+            return datetime.time(parts['hour'], parts['minute'], parts['second'], parts['microsecond'])
+        if not parts['time']:
+            return datetime.date(parts['year'], parts['month'], parts['day'])
+        del parts['time'], parts['date']
+        return datetime.datetime(**parts)
+
+    match = _ISO_DURATION.match(value)
+    if match and any(match.groups()):
+        return datetime.timedelta(**{key: float(part) if part else 0 for key, part in match.groupdict(0).items()})
+
+    raise ValueError(f'Invalid datetime value {value}')
+
+
+# Текст строки без форматирования: простой текст и текст прогонов (фонетические подсказки не входят)
+def _text_content(element):
+    snippets = []
+    text = element.find(_TEXT)
+    if text is not None:
+        snippets.append(text.text or '')
+    for run in element.iterfind(_RUN):
+        run_text = run.find(_TEXT)
+        if run_text is not None:
+            snippets.append(run_text.text or '')
+    return ''.join(snippets)
+
+
+def _cast_number(value):
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+class XlsxReader:
+    def __init__(self, filename):
+        self.filename = filename
+        with zipfile.ZipFile(filename) as archive:
+            names = set(archive.namelist())
+            self.sheet_paths = sheet_paths(archive)
+            self.epoch = self._read_epoch(archive)
+            self.shared_strings = self._read_shared_strings(archive) if 'xl/sharedStrings.xml' in names else []
+            self.date_formats, self.timedelta_formats = (self._read_date_formats(archive)
+                                                         if 'xl/styles.xml' in names else (set(), set()))
+
+    @property
+    def sheet_names(self):
+        return list(self.sheet_paths)
+
+    @staticmethod
+    def _read_epoch(archive):
+        workbook = etree.fromstring(archive.read('xl/workbook.xml'))
+        workbook_pr = workbook.find(f'{_MAIN_NS}workbookPr')
+        date1904 = workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true')
+        return _MAC_EPOCH if date1904 else _WINDOWS_EPOCH
+
+    @staticmethod
+    def _read_shared_strings(archive):
+        strings = []
+        with archive.open('xl/sharedStrings.xml') as f:
+            for _, si in etree.iterparse(f, tag=f'{_MAIN_NS}si'):
+                strings.append(_text_content(si).replace('x005F_', ''))
+                si.clear()
+        return strings
+
+    # Номера стилей ячеек с форматом даты и с форматом длительности
+    @staticmethod
+    def _read_date_formats(archive):
+        root = etree.fromstring(archive.read('xl/styles.xml'))
+        custom = {int(fmt.get('numFmtId')): fmt.get('formatCode') for fmt in root.iter(f'{_MAIN_NS}numFmt')}
+        date_formats = set()
+        timedelta_formats = set()
+        cell_xfs = root.find(f'{_MAIN_NS}cellXfs')
+        for index, xf in enumerate(cell_xfs.iterfind(f'{_MAIN_NS}xf') if cell_xfs is not None else ()):
+            num_fmt_id = int(xf.get('numFmtId', 0))
+            code = custom.get(num_fmt_id, _BUILTIN_DATE_FORMATS.get(num_fmt_id))
+            if code is None:
+                continue
+            if _is_date_format(code):
+                date_formats.add(index)
+            if _is_timedelta_format(code):
+                timedelta_formats.add(index)
+        return date_formats, timedelta_formats
+
+    def _cell_value(self, cell):
+        data_type = cell.get('t', 'n')
+        if data_type == 'inlineStr':
+            inline = cell.find(_INLINE_STRING)
+            return None if inline is None else _text_content(inline)
+
+        # Перебор дочерних элементов быстрее findtext: у ячейки их не больше трёх (f, v, extLst)
+        value = None
+        for child in cell:
+            if child.tag == _VALUE:
+                value = child.text
+                break
+        if not value:
+            return None
+        if data_type == 'n':
+            value = _cast_number(value)
+            style_id = int(cell.get('s', 0))
+            if style_id in self.date_formats:
+                try:
+                    return _from_excel(value, self.epoch, timedelta=style_id in self.timedelta_formats)
+                except (OverflowError, ValueError):
+                    return '#VALUE!'
+            return value
+        if data_type == 's':
+            return self.shared_strings[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            return _from_iso8601(value)
+        return value
+
+    # Строки листа кортежами значений, как ws.iter_rows(values_only=True) после reset_dimensions в режиме
+    # только для чтения: читаются все элементы row, ширина строки - по последней ячейке, но не меньше ширины
+    # из элемента dimension (ему нельзя доверять, см. WorkbookCache.iter_rows), пропущенные строки выдаются пустыми
+    def iter_rows(self, sheet_name):
+        min_width = 0
+        row_counter = 0
+        # Буквы колонки -> номер колонки
+        columns = {}
+        cell_value = self._cell_value
+        with zipfile.ZipFile(self.filename) as archive, archive.open(self.sheet_paths[sheet_name]) as f:
+            for _, element in etree.iterparse(f, tag=(_DIMENSION, _ROW)):
+                if element.tag == _DIMENSION:
+                    bounds = _COORDINATE.findall(element.get('ref', ''))
+                    if bounds:
+                        min_width = column_number(bounds[-1][0])
+                    continue
+
+                row_number = int(element.get('r', row_counter + 1))
+                # Строки идут по возрастанию номеров; повторный номер пропускается
+                if row_number <= row_counter:
+                    continue
+                for _ in range(row_counter + 1, row_number):
+                    yield (None,) * min_width
+                row_counter = row_number
+
+                cells = []
+                col_counter = 0
+                for cell in element.iterfind(_CELL):
+                    coordinate = cell.get('r')
+                    if coordinate:
+                        letters = coordinate.rstrip(_DIGITS)
+                        col_counter = columns.get(letters)
+                        if col_counter is None:
+                            col_counter = columns[letters] = column_number(letters)
+                    else:
+                        col_counter += 1
+                    cells.append((col_counter, cell_value(cell)))
+
+                row = [None] * max(min_width, max((col for col, _ in cells), default=0))
+                for col, value in cells:
+                    row[col - 1] = value
+                yield tuple(row)
+
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]